@@ -0,0 +1,130 @@
+import os
+import mmap
+import struct
+import tempfile
+import pygame
+from settings import SPRITE_SIZES, ASSET_CACHE_DIR
+
+# 图片解码缓存和碰撞遮罩：只用到pygame的图片、缩放和遮罩模块，不调用pygame.init()，不创建窗口和字体，
+# 无窗口模拟可以单独导入本模块加载遮罩；带画面游戏的资源由resource_load在后台线程中通过这里加载
+
+# 资源文件路径
+IMAGE_PATHS = {
+    "bg0": "start_bg0.jpg",
+    "bg1": "map1.jpg",
+    "start": "start.png",
+    "plane": "plane.png",
+    "boss_1": "boss_1.png",
+    "boss_2": "boss_2.png",
+    "bullet": "alien_bullet.png",
+    "missile": "feidan.png",
+    "enemies": [f"alien_{i}.png" for i in range(1, 6)]
+}
+
+# 解码缓存文件：文件头（魔数、版本、每像素字节数、宽、高、源文件修改时间和大小）之后是未压缩的像素，
+# 源文件修改时间或大小变化后缓存失效；读取时直接内存映射，不再解码和缩放
+CACHE_MAGIC = b"ZNAC"
+CACHE_VERSION = 1
+CACHE_HEADER = struct.Struct("<4sBBHHqq")
+PIXEL_FORMATS = {3: "RGB", 4: "RGBA"}
+
+# 不透明的图片缓存为RGB，显示时直接convert()；其余缓存为RGBA，显示时convert_alpha()
+OPAQUE_SPRITES = ["bg0", "bg1"]
+# 像素碰撞用的遮罩：由逻辑尺寸的精灵在加载时一次生成，碰撞检测在逻辑坐标中进行，与窗口缩放无关
+MASK_SPRITES = ["plane", "boss_1", "boss_2", "bullet", "missile", "enemies"]
+collision_masks = {}
+
+
+# 加载图片资源
+def load_image(path):
+    return pygame.image.load(path)
+
+
+# 加载精灵图片并缩放到其在逻辑画面中的尺寸
+def load_sprite(name, path):
+    image = load_image(path)
+    size = SPRITE_SIZES.get(name)
+    if size is not None and image.get_size() != size:
+        image = pygame.transform.smoothscale(image, size)
+    return image
+
+
+def _cache_path(name, path):
+    w, h = SPRITE_SIZES.get(name, (0, 0))
+    return os.path.join(ASSET_CACHE_DIR, f"{os.path.splitext(os.path.basename(path))[0]}_{w}x{h}.raw")
+
+
+# 从缓存中映射解码后的像素，缓存不存在或已失效时返回None
+def read_cached_sprite(name, path):
+    try:
+        stat = os.stat(path)
+        with open(_cache_path(name, path), "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    except (OSError, ValueError):
+        return None
+    if len(data) >= CACHE_HEADER.size:
+        magic, version, depth, w, h, mtime, size = CACHE_HEADER.unpack_from(data, 0)
+        if (magic == CACHE_MAGIC and version == CACHE_VERSION and depth in PIXEL_FORMATS and
+                mtime == stat.st_mtime_ns and size == stat.st_size and
+                len(data) == CACHE_HEADER.size + w * h * depth):
+            # 表面直接引用映射的内存，convert()时才复制为显示格式
+            return pygame.image.frombuffer(memoryview(data)[CACHE_HEADER.size:], (w, h), PIXEL_FORMATS[depth])
+    data.close()
+    return None
+
+
+# 把解码后的像素写入缓存，先写临时文件再替换；写不进去时只是下次仍需解码
+def write_cached_sprite(name, path, image):
+    depth = 3 if name in OPAQUE_SPRITES else 4
+    if depth == 4 and not image.get_flags() & pygame.SRCALPHA:
+        # 调色板或颜色键透明的图片先转为逐像素透明
+        rgba = pygame.Surface(image.get_size(), pygame.SRCALPHA, 32)
+        rgba.blit(image, (0, 0))
+        image = rgba
+    stat = os.stat(path)
+    w, h = image.get_size()
+    tmp_path = None
+    try:
+        os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=ASSET_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, depth, w, h, stat.st_mtime_ns, stat.st_size))
+            f.write(pygame.image.tobytes(image, PIXEL_FORMATS[depth]))
+        os.replace(tmp_path, _cache_path(name, path))
+    except OSError:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# 优先从缓存读取，未命中时解码、缩放并写入缓存
+def load_cached_sprite(name, path):
+    if ASSET_CACHE_DIR is None:
+        return load_sprite(name, path)
+    image = read_cached_sprite(name, path)
+    if image is None:
+        image = load_sprite(name, path)
+        write_cached_sprite(name, path, image)
+    return image
+
+
+# 加载一个名称对应的精灵，敌机等多张图片的名称返回列表
+def load_cached_sprites(name):
+    path = IMAGE_PATHS[name]
+    if isinstance(path, list):
+        return [load_cached_sprite(name, p) for p in path]
+    return load_cached_sprite(name, path)
+
+
+# 由逻辑尺寸的精灵生成碰撞遮罩，敌机为按kind排列的列表
+def build_masks(loaded):
+    return {name: [pygame.mask.from_surface(image) for image in loaded[name]]
+            if isinstance(loaded[name], list) else pygame.mask.from_surface(loaded[name])
+            for name in MASK_SPRITES}
+
+
+# 取得像素碰撞用的遮罩：带画面的游戏由资源加载线程填充；无窗口模拟只加载碰撞用到的几张精灵（同样经过解码缓存），
+# 不加载背景和字体，也不等待资源加载线程
+def load_collision_masks():
+    if not collision_masks:
+        collision_masks.update(build_masks({name: load_cached_sprites(name) for name in MASK_SPRITES}))
+    return collision_masks
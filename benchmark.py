@@ -0,0 +1,253 @@
+import os
+
+# 基准测试使用SDL的dummy视频驱动，不需要真实窗口，必须在导入pygame之前设置
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import contextlib
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+from game_logic import InputCommand, init_game_variables, update_game_state, check_collisions, enter_phase
+from game_state import Rules
+from settings import COLLISION_MODE, GAME_WIDTH
+from waves import find_boss_phase, compile_script
+
+DEFAULT_FRAMES = 3000
+WARMUP_FRAMES = 120
+SEED = 12345
+
+
+# 脚本化输入：键盘控制，追踪最近的敌机或Boss并定时开火
+def scripted_input(game_vars):
+    enemies = game_vars.wave.enemies
+    boss = game_vars.boss
+    if boss.active:
+        target = boss.x + boss.w / 2
+    elif enemies.count:
+        i = enemies.indices()[0]
+        target = enemies.x[i] + enemies.w / 2
+    else:
+        target = GAME_WIDTH / 2
+    center = game_vars.player.x + game_vars.player.w / 2
+    return InputCommand(left=center > target + 8, right=center < target - 8,
+                        fire=game_vars.clock.tick % 10 == 0)
+
+
+# 各场景每帧调用一次pin，把进度固定在要测的阶段
+def pin_normal(game_vars):
+    game_vars.wave.normal_killed = 0
+
+
+# 把波次脚本的游标停在指定类型的Boss阶段
+def pin_boss_phase(game_vars, boss):
+    index = find_boss_phase(game_vars.script, boss)
+    if not game_vars.boss.active and game_vars.wave.phase != index:
+        enter_phase(game_vars, index)
+
+
+def pin_boss1(game_vars):
+    pin_boss_phase(game_vars, 1)
+
+
+def pin_boss2(game_vars):
+    pin_boss_phase(game_vars, 2)
+
+
+def pin_fast(game_vars):
+    game_vars.wave.normal_killed = 0
+    game_vars.wave.boss2_killed = 4
+    game_vars.speed_multiplier = 1.5 ** 4
+
+
+def pin_swarm(game_vars):
+    game_vars.wave.normal_killed = 0
+    game_vars.wave.max_enemies = 40
+    game_vars.projectiles.max_bullets = 400
+    game_vars.projectiles.bullet_cooldown = 0.3
+
+
+# 弹幕压力测试：不会被击落也不会逃跑的Boss2持续发射转向的螺旋弹，场上稳定保持一千多颗子弹
+BULLET_HELL_SCRIPT = compile_script({"phases": [{
+    "type": "boss", "boss": 2, "health": 10 ** 9, "escape_time": 10 ** 9,
+    "fire": {"pattern": "spiral", "count": 24, "cooldown": 0.05, "speed": 120, "spin": 37, "turn": 20,
+             "max_bullets": 2000},
+}]})
+
+
+def pin_bullet_hell(game_vars):
+    if game_vars.script is not BULLET_HELL_SCRIPT:
+        game_vars.script = BULLET_HELL_SCRIPT
+        enter_phase(game_vars, 0)
+
+
+SCENARIOS = {
+    "normal_waves": pin_normal,
+    "boss1": pin_boss1,
+    "boss2": pin_boss2,
+    "fast_after_boss2": pin_fast,
+    "swarm": pin_swarm,
+    "bullet_hell": pin_bullet_hell,
+}
+
+
+def stats_ms(values):
+    values = np.asarray(values) * 1000
+    return {"mean": float(values.mean()), "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)), "p99": float(np.percentile(values, 99))}
+
+
+# 运行单个场景：不限帧率，忽略游戏结束，分别统计逻辑更新和渲染耗时；render为False时只测逻辑，渲染耗时为None
+def run_scenario(name, frames=DEFAULT_FRAMES, seed=SEED, render=True):
+    pin = SCENARIOS[name]
+    renderer = masks = None
+    if render:
+        # 只有渲染时才导入functions_all（创建窗口并加载全部资源）；只测逻辑时像素遮罩由asset_cache单独加载
+        import pygame
+        import functions_all as renderer
+        masks = renderer.collision_masks
+        renderer.frame_renderer.invalidate()
+    game_vars = init_game_variables(1, seed=seed, rules=Rules(collision=COLLISION_MODE), masks=masks)
+    update_times = np.zeros(frames)
+    render_times = np.zeros(frames)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for frame in range(-WARMUP_FRAMES, frames):
+            if frame == 0:
+                gc.collect()
+                gc_start = gc.get_stats()[0]["collections"]
+                blocks_start = sys.getallocatedblocks()
+                wall_start = time.perf_counter()
+
+            if renderer is not None:
+                pygame.event.pump()
+            pin(game_vars)
+            command = scripted_input(game_vars)
+
+            t0 = time.perf_counter()
+            update_game_state(game_vars, command)
+            check_collisions(game_vars)
+            t1 = time.perf_counter()
+            if renderer is not None:
+                renderer.render_frame(game_vars)
+            t2 = time.perf_counter()
+
+            if game_vars.game_over:
+                game_vars.game_over = False
+                game_vars.score = max(game_vars.score, 0)
+
+            if frame >= 0:
+                update_times[frame] = t1 - t0
+                render_times[frame] = t2 - t1
+
+        wall = time.perf_counter() - wall_start
+        gc_collections = gc.get_stats()[0]["collections"] - gc_start
+        blocks = sys.getallocatedblocks() - blocks_start
+
+    return {
+        "frames": frames,
+        "fps": frames / wall,
+        "update_ms": stats_ms(update_times),
+        "render_ms": stats_ms(render_times) if render else None,
+        # 第0代GC次数反映每帧分配的容器对象数量；已分配内存块的净增长反映泄漏
+        "gc_gen0_per_1k_frames": gc_collections * 1000 / frames,
+        "net_blocks_per_frame": blocks / frames,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_all(names, frames, seed, render=True):
+    results = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "pygame": None,
+        "machine": platform.machine(),
+        "frames": frames,
+        "seed": seed,
+        "render": render,
+        "scenarios": {},
+    }
+    if render:
+        import pygame
+
+        results["pygame"] = pygame.version.ver
+    for name in names:
+        results["scenarios"][name] = run_scenario(name, frames, seed, render)
+        print_result(name, results["scenarios"][name])
+    return results
+
+
+def print_result(name, result):
+    line = (f"{name:<18} {result['fps']:9.1f} fps  "
+            f"update {result['update_ms']['mean']:.3f}/{result['update_ms']['p95']:.3f} ms  ")
+    render = result["render_ms"]
+    if render is not None:
+        line += f"render {render['mean']:.3f}/{render['p95']:.3f} ms  "
+    print(line + f"gc0 {result['gc_gen0_per_1k_frames']:.1f}/1k  blocks {result['net_blocks_per_frame']:+.2f}/frame")
+
+
+# 对比两次结果，列出各指标的变化百分比（耗时类指标为负表示变快）；只读JSON，不需要显示设备
+def compare(base_path, new_path):
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"base {base.get('revision')}  ->  new {new.get('revision')}")
+    metrics = [("fps", lambda r: r["fps"]),
+               ("update mean ms", lambda r: r["update_ms"]["mean"]),
+               ("update p95 ms", lambda r: r["update_ms"]["p95"]),
+               ("render mean ms", lambda r: r["render_ms"] and r["render_ms"]["mean"]),
+               ("render p95 ms", lambda r: r["render_ms"] and r["render_ms"]["p95"]),
+               ("gc0 / 1k frames", lambda r: r["gc_gen0_per_1k_frames"])]
+    for name in base["scenarios"]:
+        if name not in new["scenarios"]:
+            continue
+        print(name)
+        for label, get in metrics:
+            old_value, new_value = get(base["scenarios"][name]), get(new["scenarios"][name])
+            # 其中一次只测了逻辑，没有渲染耗时
+            if old_value is None or new_value is None:
+                continue
+            change = (new_value - old_value) / old_value * 100 if old_value else 0.0
+            print(f"  {label:<16}{old_value:10.3f}{new_value:10.3f}{change:+9.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="智能雷电 基准测试")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="只运行指定场景，可重复，默认全部")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", help="把结果写入JSON文件")
+    parser.add_argument("--headless", action="store_true", help="只测逻辑更新，不导入渲染模块也不创建窗口")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="对比两个结果文件")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run_all(args.scenario or list(SCENARIOS), args.frames, args.seed, not args.headless)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if not args.headless:
+        import functions_all
+
+        functions_all.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import math
+import numpy as np
+
+# 弹幕生成：每种弹幕按发射参数一次算出整组子弹的飞行方向（弧度，0为向右、π/2为向下），
+# 子弹随后由BulletPool按参数方程批量求位置
+
+DOWN = math.pi / 2
+
+
+# 单发，垂直向下
+def single(fire, x, y, target, time):
+    return np.array([DOWN])
+
+
+# 扇形：count发均匀分布在以正下方为中心、张角arc度的扇面内
+def spread(fire, x, y, target, time):
+    return _fan(DOWN, fire.count, fire.arc)
+
+
+# 自机狙：以指向目标的方向为中心的扇形，count为1时直接瞄准
+def aimed(fire, x, y, target, time):
+    if target is None:
+        return _fan(DOWN, fire.count, fire.arc)
+    return _fan(math.atan2(target[1] - y, target[0] - x), fire.count, fire.arc)
+
+
+# 环形：count发均匀分布一整圈
+def ring(fire, x, y, target, time):
+    return DOWN + np.arange(fire.count) * (2 * math.pi / fire.count)
+
+
+# 螺旋：环形整体随时间旋转，spin为每秒旋转的角度，连续发射时形成旋臂
+def spiral(fire, x, y, target, time):
+    return ring(fire, x, y, target, time) + math.radians(fire.spin) * time
+
+
+def _fan(center, count, arc):
+    if count == 1:
+        return np.array([center])
+    half = math.radians(arc) / 2
+    return np.linspace(center - half, center + half, count)
+
+
+PATTERNS = {
+    "single": single,
+    "spread": spread,
+    "aimed": aimed,
+    "ring": ring,
+    "spiral": spiral,
+}
+
+
+# 计算一次发射的所有子弹方向；target为瞄准目标的中心坐标
+def pattern_angles(fire, x, y, target, time):
+    return PATTERNS[fire.pattern](fire, x, y, target, time)
@@ -0,0 +1,105 @@
+import math
+import numpy as np
+
+# 两组数量乘积不超过该值时直接做稠密矩阵比较，超过后改用排序扫描(sort and sweep)粗筛
+BRUTE_FORCE_LIMIT = 4096
+
+EMPTY_INDEX = np.zeros(0, dtype=np.intp)
+
+
+# 取实体池中存活实体的圆形碰撞体：(槽位下标, 圆心x, 圆心y, 半径)，半径默认取宽高较小值的一半
+def pool_circles(pool, radius=None):
+    idx = pool.indices()
+    if radius is None:
+        radius = inner_radius(pool.w, pool.h)
+    return idx, pool.x[idx] + pool.w / 2, pool.y[idx] + pool.h / 2, np.full(len(idx), radius)
+
+
+# 宽高较小值的一半，即矩形的内切圆半径，圆形碰撞的默认近似
+def inner_radius(w, h):
+    return min(w, h) / 2
+
+
+# 完全包住w×h矩形的外接圆半径，像素碰撞用它粗筛，不会漏掉真正重叠的一对
+def bounding_radius(w, h):
+    return math.hypot(w, h) / 2
+
+
+# 单个矩形对应的圆形碰撞体，半径默认取宽高较小值的一半
+def rect_circle(x, y, w, h, radius=None):
+    r = min(w, h) / 2 if radius is None else radius
+    return np.array([x + w / 2]), np.array([y + h / 2]), np.array([r])
+
+
+# 圆与圆批量相交测试，返回所有相交对在a、b两组中的下标(ia, ib)，按ia、ib升序排列
+def circle_pairs(ax, ay, ar, bx, by, br):
+    na, nb = len(ax), len(bx)
+    if na == 0 or nb == 0:
+        return EMPTY_INDEX, EMPTY_INDEX
+
+    if na * nb <= BRUTE_FORCE_LIMIT:
+        dx = ax[:, None] - bx[None, :]
+        dy = ay[:, None] - by[None, :]
+        reach = ar[:, None] + br[None, :]
+        return np.nonzero(dx * dx + dy * dy <= reach * reach)
+
+    # 粗筛：沿b分布更开的坐标轴排序，对每个a用二分查找取出该轴上可能相交的连续区间
+    if np.ptp(by) > np.ptp(bx):
+        a_key, b_key = ay, by
+    else:
+        a_key, b_key = ax, bx
+    order = np.argsort(b_key, kind="stable")
+    sorted_key = b_key[order]
+    reach_axis = ar + br.max()
+    lo = np.searchsorted(sorted_key, a_key - reach_axis, side="left")
+    hi = np.searchsorted(sorted_key, a_key + reach_axis, side="right")
+    counts = hi - lo
+    total = int(counts.sum())
+    if total == 0:
+        return EMPTY_INDEX, EMPTY_INDEX
+
+    # 把每个区间展开成候选对
+    ia = np.repeat(np.arange(na), counts)
+    starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+    ib = order[starts + np.arange(total)]
+
+    # 精确测试
+    dx = ax[ia] - bx[ib]
+    dy = ay[ia] - by[ib]
+    reach = ar[ia] + br[ib]
+    hit = dx * dx + dy * dy <= reach * reach
+    ia, ib = ia[hit], ib[hit]
+
+    # 与稠密矩阵分支保持相同的输出顺序
+    sort = np.lexsort((ib, ia))
+    return ia[sort], ib[sort]
+
+
+# 两个轴对齐矩形是否相交
+def rects_overlap(ax, ay, aw, ah, bx, by, bw, bh):
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+
+# 一组圆中与给定圆相交的下标
+def circle_hits(ax, ay, ar, x, y, r):
+    if len(ax) == 0:
+        return EMPTY_INDEX
+    dx = ax - x
+    dy = ay - y
+    reach = ar + r
+    return np.flatnonzero(dx * dx + dy * dy <= reach * reach)
+
+
+# 左上角分别位于(ax, ay)、(bx, by)的两个遮罩是否有重叠的不透明像素；遮罩为pygame.mask.Mask，由resource_load生成
+def masks_overlap(mask_a, ax, ay, mask_b, bx, by):
+    return mask_a.overlap(mask_b, (int(round(bx - ax)), int(round(by - ay)))) is not None
+
+
+# 判断一组圆中是否有任意一个与给定圆相交
+def any_circle_hit(ax, ay, ar, x, y, r):
+    if len(ax) == 0:
+        return False
+    dx = ax - x
+    dy = ay - y
+    reach = ar + r
+    return bool(np.any(dx * dx + dy * dy <= reach * reach))
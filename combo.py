@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from settings import COMBO_WINDOW, COMBO_TIERS, COMBO_CAPACITY
+
+
+# 连击计数：命中时间存放在定长环形缓冲区中，插入和过期都是O(1)，运行中不分配新对象
+@dataclass(slots=True)
+class ComboTracker:
+    window: float = COMBO_WINDOW
+    # (窗口内命中数, 每次连击得分)，按命中数从小到大排列
+    tiers: tuple = COMBO_TIERS
+    capacity: int = COMBO_CAPACITY
+    times: list | None = None
+    # 环形缓冲区中最早一次命中的位置和窗口内的命中数
+    head: int = 0
+    size: int = 0
+
+    # 连击次数及上次连击得分的时间
+    count: int = 0
+    last_score_time: float = float('-inf')
+
+    # 统计：发射数、命中数、当前连续命中数（相邻命中间隔不超过窗口）和最长连续命中数
+    shots: int = 0
+    total_hits: int = 0
+    streak: int = 0
+    best_streak: int = 0
+    last_hit_time: float = float('-inf')
+
+    def __post_init__(self):
+        if self.times is None:
+            self.times = [0.0] * self.capacity
+
+    def record_shot(self):
+        self.shots += 1
+
+    def record_hit(self, t):
+        if t - self.last_hit_time <= self.window:
+            self.streak += 1
+        else:
+            self.streak = 1
+        if self.streak > self.best_streak:
+            self.best_streak = self.streak
+        self.last_hit_time = t
+        self.total_hits += 1
+
+        # 缓冲区满时覆盖最早的记录
+        if self.size == self.capacity:
+            self.head = (self.head + 1) % self.capacity
+            self.size -= 1
+        self.times[(self.head + self.size) % self.capacity] = t
+        self.size += 1
+
+    # 丢弃超出时间窗口的命中
+    def expire(self, now):
+        times, capacity = self.times, self.capacity
+        while self.size and now - times[self.head] > self.window:
+            self.head = (self.head + 1) % capacity
+            self.size -= 1
+
+    # 最近两次命中的间隔，不足两次时返回None
+    def last_interval(self):
+        if self.size < 2:
+            return None
+        last = (self.head + self.size - 1) % self.capacity
+        return self.times[last] - self.times[last - 1]
+
+    # 按窗口内命中数取得当前档位的连击得分，未达到最低档时为0
+    def tier_bonus(self):
+        bonus = 0
+        for hits, points in self.tiers:
+            if self.size >= hits:
+                bonus = points
+        return bonus
+
+    # 窗口内每秒命中数
+    def hit_rate(self):
+        return self.size / self.window
+
+    def accuracy(self):
+        return self.total_hits / self.shots if self.shots else 0.0
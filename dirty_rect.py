@@ -0,0 +1,71 @@
+import pygame
+
+# 脏矩形总面积超过屏幕面积的该比例时，直接整屏刷新更划算
+FULL_UPDATE_RATIO = 0.5
+
+
+# 脏矩形渲染：记录上一帧和本帧所有精灵占用的区域，只恢复这些区域的背景并只提交这些区域到显示器
+class DirtyRectTracker:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.previous = []
+        self.current = []
+        self.previous_area = 0
+        self.full_redraw = True
+        # 上一帧绘制的区域过多（如大量子弹）时，整块铺背景比逐个恢复矩形更快
+        self.restore_all = False
+
+    # 下一帧整屏重绘，例如窗口大小改变或从菜单界面切回游戏时：屏幕上已不是上一帧记录的内容，
+    # 按上一帧绘制面积决定的整块恢复也一并作废
+    def invalidate(self):
+        self.full_redraw = True
+        self.restore_all = False
+
+    # 开始新的一帧：用背景覆盖上一帧画过的区域
+    # area为背景在屏幕上的区域，默认整个屏幕；本帧的绘制都被裁剪在该区域内，区域外为黑边
+    def begin_frame(self, screen, background, area=None):
+        screen_rect = screen.get_rect()
+        if area is None:
+            area = screen_rect
+        if self.full_redraw or not self.enabled:
+            screen.set_clip(None)
+            if area != screen_rect:
+                screen.fill((0, 0, 0))
+            screen.blit(background, area)
+        elif self.restore_all:
+            screen.blit(background, area)
+        else:
+            screen.blits([(background, rect, rect.move(-area.x, -area.y)) for rect in self.previous], False)
+        screen.set_clip(area)
+
+    # 绘制精灵并记录其区域
+    def blit(self, screen, surface, pos):
+        self.current.append(screen.blit(surface, pos))
+
+    # 在一组位置上绘制同一张精灵，一次blits调用完成，适合大量子弹
+    def blit_many(self, screen, surface, positions):
+        self.current.extend(screen.blits([(surface, pos) for pos in positions]))
+
+    # 绘制矩形并记录其区域
+    def draw_rect(self, screen, color, rect):
+        self.current.append(pygame.draw.rect(screen, color, rect))
+
+    # 提交本帧：只把上一帧和本帧的区域更新到显示器
+    def end_frame(self, screen):
+        limit = screen.get_width() * screen.get_height() * FULL_UPDATE_RATIO
+        current_area = sum(rect.width * rect.height for rect in self.current)
+        if self.full_redraw or not self.enabled:
+            pygame.display.update()
+        else:
+            dirty = self.previous + self.current
+            if self.previous_area + current_area > limit:
+                pygame.display.update()
+            else:
+                pygame.display.update(dirty)
+        self.previous_area = current_area
+        self.restore_all = current_area > limit
+
+        screen.set_clip(None)
+        self.previous, self.current = self.current, self.previous
+        self.current.clear()
+        self.full_redraw = False
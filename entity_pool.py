@@ -0,0 +1,251 @@
+import numpy as np
+
+
+# 预分配的实体池：位置、速度、存活标记都存放在定长数组中，
+# 空闲槽位通过栈式空闲表复用，生成和销毁实体都不会分配新对象
+class EntityPool:
+    def __init__(self, capacity, width, height):
+        self.capacity = capacity
+        self.w = width
+        self.h = height
+
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        # 上一个逻辑帧的位置，渲染时在两帧之间插值
+        self.prev_x = np.zeros(capacity, dtype=np.float64)
+        self.prev_y = np.zeros(capacity, dtype=np.float64)
+        self.vx = np.zeros(capacity, dtype=np.float64)
+        self.vy = np.zeros(capacity, dtype=np.float64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.kind = np.zeros(capacity, dtype=np.int16)
+        self.spawn_time = np.zeros(capacity, dtype=np.float64)
+        self.next_fire = np.zeros(capacity, dtype=np.float64)
+
+        # 空闲表：free[:free_top]为可用槽位，栈顶优先复用最近释放的槽位
+        self.free = np.arange(capacity - 1, -1, -1, dtype=np.int32)
+        self.free_top = capacity
+        self.count = 0
+        # 曾经使用过的最高槽位+1，逐帧运算只处理[:high]区间
+        self.high = 0
+
+        # 每帧复用的临时缓冲区
+        self._scratch = np.zeros(capacity, dtype=np.float64)
+        self._mask = np.zeros(capacity, dtype=bool)
+        self._test = np.zeros(capacity, dtype=bool)
+        self._scratch_mask = np.zeros(capacity, dtype=bool)
+        self._draw_x = np.zeros(capacity, dtype=np.float64)
+        self._draw_y = np.zeros(capacity, dtype=np.float64)
+
+    # 生成实体，池满时返回-1
+    def spawn(self, x, y, vx=0.0, vy=0.0, kind=0, spawn_time=0.0, next_fire=0.0):
+        if self.free_top == 0:
+            return -1
+        self.free_top -= 1
+        index = int(self.free[self.free_top])
+        if index >= self.high:
+            self.high = index + 1
+        self.x[index] = self.prev_x[index] = x
+        self.y[index] = self.prev_y[index] = y
+        self.vx[index] = vx
+        self.vy[index] = vy
+        self.kind[index] = kind
+        self.spawn_time[index] = spawn_time
+        self.next_fire[index] = next_fire
+        self.alive[index] = True
+        self.count += 1
+        return index
+
+    # 销毁单个实体
+    def kill(self, index):
+        if self.alive[index]:
+            self.alive[index] = False
+            self.free[self.free_top] = index
+            self.free_top += 1
+            self.count -= 1
+
+    # 批量销毁mask中为True的存活实体，返回销毁数量
+    def kill_mask(self, mask):
+        high = self.high
+        hit = self._mask[:high]
+        np.logical_and(mask[:high], self.alive[:high], out=hit)
+        indices = hit.nonzero()[0]
+        n = len(indices)
+        if n:
+            self.alive[indices] = False
+            self.free[self.free_top:self.free_top + n] = indices
+            self.free_top += n
+            self.count -= n
+        return n
+
+    # 清空所有实体
+    def clear(self):
+        self.alive[:] = False
+        self.free[:] = np.arange(self.capacity - 1, -1, -1, dtype=np.int32)
+        self.free_top = self.capacity
+        self.count = 0
+        self.high = 0
+
+    # 当前存活实体的槽位下标
+    def indices(self):
+        return self.alive[:self.high].nonzero()[0]
+
+    # 按速度推进所有槽位，scale为本帧时长（秒）乘以速度倍率；空槽位的坐标无意义，生成时会被重新赋值
+    def integrate(self, scale=1.0):
+        high = self.high
+        x, y, scratch = self.x[:high], self.y[:high], self._scratch[:high]
+        self.prev_x[:high] = x
+        self.prev_y[:high] = y
+        np.multiply(self.vx[:high], scale, out=scratch)
+        np.add(x, scratch, out=x)
+        np.multiply(self.vy[:high], scale, out=scratch)
+        np.add(y, scratch, out=y)
+
+    # 渲染用的插值位置：alpha为0时是上一个逻辑帧的位置，为1时是当前位置，返回的数组按槽位下标访问
+    def interpolated(self, alpha):
+        high = self.high
+        draw_x, draw_y = self._draw_x[:high], self._draw_y[:high]
+        np.subtract(self.x[:high], self.prev_x[:high], out=draw_x)
+        draw_x *= alpha
+        draw_x += self.prev_x[:high]
+        np.subtract(self.y[:high], self.prev_y[:high], out=draw_y)
+        draw_y *= alpha
+        draw_y += self.prev_y[:high]
+        return draw_x, draw_y
+
+    # 销毁完全离开给定区域的实体，返回销毁数量
+    def cull_outside(self, left, top, right, bottom):
+        high = self.high
+        x, y = self.x[:high], self.y[:high]
+        mask, test = self._test[:high], self._scratch_mask[:high]
+        np.less(x, left - self.w, out=mask)
+        np.greater(x, right, out=test)
+        mask |= test
+        np.less(y, top - self.h, out=test)
+        mask |= test
+        np.greater(y, bottom, out=test)
+        mask |= test
+        return self.kill_mask(mask)
+
+    # 保存已使用区间内的全部数据，用于存档和回滚
+    def snapshot(self):
+        high = self.high
+        return (high, self.free_top, self.count, self.free[:self.free_top].copy(),
+                self.x[:high].copy(), self.y[:high].copy(), self.prev_x[:high].copy(), self.prev_y[:high].copy(),
+                self.vx[:high].copy(), self.vy[:high].copy(),
+                self.alive[:high].copy(), self.kind[:high].copy(), self.spawn_time[:high].copy(),
+                self.next_fire[:high].copy())
+
+    def restore(self, snapshot):
+        high, free_top, count, free, x, y, prev_x, prev_y, vx, vy, alive, kind, spawn_time, next_fire = snapshot
+        self.alive[:] = False
+        self.high, self.free_top, self.count = high, free_top, count
+        self.free[:free_top] = free
+        self.x[:high] = x
+        self.y[:high] = y
+        self.prev_x[:high] = prev_x
+        self.prev_y[:high] = prev_y
+        self.vx[:high] = vx
+        self.vy[:high] = vy
+        self.alive[:high] = alive
+        self.kind[:high] = kind
+        self.spawn_time[:high] = spawn_time
+        self.next_fire[:high] = next_fire
+
+
+# 子弹池：位置由参数方程按飞行时间直接求出，而不是逐帧累加速度，
+# 每颗子弹记录发射点、初速度和转向角速度，整池每帧一次向量运算求出全部位置
+class BulletPool(EntityPool):
+    def __init__(self, capacity, width, height):
+        super().__init__(capacity, width, height)
+        self.origin_x = np.zeros(capacity, dtype=np.float64)
+        self.origin_y = np.zeros(capacity, dtype=np.float64)
+        # 速度方向每秒旋转的角度（弧度），0为直线飞行
+        self.turn = np.zeros(capacity, dtype=np.float64)
+
+        self._age = np.zeros(capacity, dtype=np.float64)
+        self._sin = np.zeros(capacity, dtype=np.float64)
+        self._cos = np.zeros(capacity, dtype=np.float64)
+
+    def spawn(self, x, y, vx=0.0, vy=0.0, kind=0, spawn_time=0.0, next_fire=0.0, turn=0.0):
+        index = super().spawn(x, y, vx, vy, kind, spawn_time, next_fire)
+        if index >= 0:
+            self.origin_x[index] = x
+            self.origin_y[index] = y
+            self.turn[index] = turn
+        return index
+
+    # 从(x, y)沿angles中的各个方向（弧度）以speed一次发射一组子弹，池满时只发射放得下的部分，返回发射数量
+    def emit(self, x, y, angles, speed, turn=0.0, spawn_time=0.0):
+        n = min(len(angles), self.free_top)
+        if n == 0:
+            return 0
+        # 与逐个spawn相同，从空闲表栈顶依次取槽位
+        index = self.free[self.free_top - n:self.free_top][::-1].astype(np.intp)
+        self.free_top -= n
+        self.high = max(self.high, int(index.max()) + 1)
+        angles = angles[:n]
+
+        self.x[index] = self.prev_x[index] = self.origin_x[index] = x
+        self.y[index] = self.prev_y[index] = self.origin_y[index] = y
+        self.vx[index] = speed * np.cos(angles)
+        self.vy[index] = speed * np.sin(angles)
+        self.turn[index] = turn
+        self.kind[index] = 0
+        self.spawn_time[index] = spawn_time
+        self.next_fire[index] = 0.0
+        self.alive[index] = True
+        self.count += n
+        return n
+
+    # 求所有槽位在time时刻的位置。飞行时间乘以time_scale（速度倍率）后代入参数方程：
+    # 直线为 origin + v·t；转向时速度以turn匀速旋转，位置为其积分 origin + (v·sin(ωt) + v⊥·(1-cos(ωt)))/ω。
+    # 速度倍率只在击落Boss时改变，而那时子弹会被清空，所以同一颗子弹的整个飞行过程倍率不变
+    def advance(self, time, time_scale=1.0):
+        high = self.high
+        if not high:
+            return
+        x, y = self.x[:high], self.y[:high]
+        vx, vy = self.vx[:high], self.vy[:high]
+        self.prev_x[:high] = x
+        self.prev_y[:high] = y
+
+        age = self._age[:high]
+        np.subtract(time, self.spawn_time[:high], out=age)
+        age *= time_scale
+
+        turn = self.turn[:high]
+        if not turn.any():
+            np.multiply(vx, age, out=x)
+            x += self.origin_x[:high]
+            np.multiply(vy, age, out=y)
+            y += self.origin_y[:high]
+            return
+
+        along, across = self._sin[:high], self._cos[:high]
+        straight = turn == 0
+        np.multiply(turn, age, out=along)
+        np.cos(along, out=across)
+        np.sin(along, out=along)
+        np.subtract(1.0, across, out=across)
+        safe = np.where(straight, 1.0, turn)
+        along /= safe
+        across /= safe
+        along[straight] = age[straight]
+        across[straight] = 0.0
+
+        np.multiply(vx, along, out=x)
+        x -= vy * across
+        x += self.origin_x[:high]
+        np.multiply(vy, along, out=y)
+        y += vx * across
+        y += self.origin_y[:high]
+
+    def snapshot(self):
+        high = self.high
+        return super().snapshot() + (self.origin_x[:high].copy(), self.origin_y[:high].copy(),
+                                     self.turn[:high].copy())
+
+    def restore(self, snapshot):
+        super().restore(snapshot[:-3])
+        high = self.high
+        self.origin_x[:high], self.origin_y[:high], self.turn[:high] = snapshot[-3:]
@@ -0,0 +1,111 @@
+import sys
+import json
+import time
+from queue import SimpleQueue, Empty
+from threading import Thread
+from settings import LOG_LEVEL, LOG_RATE_LIMIT, EVENT_LOG_FILE
+from game_events import LEVELS
+
+STOP_TIMEOUT = 2.0
+
+
+def _json_default(value):
+    # numpy标量
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+# 游戏事件日志：作为事件总线的订阅者，主循环中只做级别判断和入队，
+# 格式化和写出都在后台线程中批量完成；控制台输出按事件类型限速，JSONL文件记录全部事件供分析
+class EventLogger:
+    def __init__(self, level=LOG_LEVEL, rate_limit=LOG_RATE_LIMIT, jsonl_path=EVENT_LOG_FILE, stream=None):
+        self.level = LEVELS[level] if isinstance(level, str) else level
+        # 每种事件每秒最多输出的条数，None为不限
+        self.rate_limit = rate_limit
+        self.jsonl_path = jsonl_path
+        self.stream = stream
+        self.queue = SimpleQueue()
+        self.thread = None
+        # 写JSONL时所有事件都要入队
+        self._min_level = self.level if jsonl_path is None else 0
+
+        # 以下只在后台线程中访问：事件类型 -> [当前1秒窗口的开始时间, 已输出条数, 被省略条数]
+        self._windows = {}
+
+    def __call__(self, event):
+        if event.level >= self._min_level:
+            if self.thread is None:
+                self.start()
+            self.queue.put((time.time(), event))
+
+    def start(self):
+        if self.thread is None:
+            self.thread = Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def close(self):
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join(STOP_TIMEOUT)
+            self.thread = None
+
+    # 限速：超出时计入省略条数，新窗口开始时先补一行省略提示
+    def _allow(self, name, timestamp, lines):
+        window = self._windows.get(name)
+        if window is None:
+            window = self._windows[name] = [timestamp, 0, 0]
+        if timestamp - window[0] >= 1.0:
+            if window[2]:
+                lines.append(f"（{name}省略了{window[2]}条）")
+            window[:] = [timestamp, 0, 0]
+        if self.rate_limit is not None and window[1] >= self.rate_limit:
+            window[2] += 1
+            return False
+        window[1] += 1
+        return True
+
+    def _run(self):
+        jsonl = open(self.jsonl_path, "a", encoding="utf-8") if self.jsonl_path else None
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self.queue.get()]
+                while True:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except Empty:
+                        break
+
+                lines = []
+                records = []
+                for item in batch:
+                    if item is None:
+                        stopping = True
+                        continue
+                    timestamp, event = item
+                    name = type(event).__name__
+                    if jsonl is not None:
+                        record = {"ts": round(timestamp, 3), "event": name, **event._asdict()}
+                        records.append(json.dumps(record, ensure_ascii=False, separators=(",", ":"),
+                                                  default=_json_default))
+                    if event.level >= self.level and self._allow(name, timestamp, lines):
+                        lines.append(event.message())
+                if stopping:
+                    for name, window in self._windows.items():
+                        if window[2]:
+                            lines.append(f"（{name}省略了{window[2]}条）")
+
+                if lines:
+                    stream = self.stream or sys.stdout
+                    stream.write("\n".join(lines) + "\n")
+                    stream.flush()
+                if records:
+                    jsonl.write("\n".join(records) + "\n")
+                    jsonl.flush()
+        finally:
+            if jsonl is not None:
+                jsonl.close()
+
+
+event_log = EventLogger()
@@ -0,0 +1,44 @@
+import numpy as np
+
+# 槽位布局：[序号, 时间戳, x, y]，人脸丢失时x、y为NaN
+SLOT_FIELDS = 4
+
+
+# 单生产者单消费者的人脸位置通道：双缓冲 + 序号(seqlock)，读写双方都不加锁
+# 生产者写入另一个槽位后再发布序号，消费者复制槽位前后各校验一次序号，被改写时重读
+class FaceChannel:
+    def __init__(self, buffer=None):
+        # buffer可以是共享内存上的数组，便于跨进程使用
+        if buffer is None:
+            buffer = np.zeros(1 + 2 * SLOT_FIELDS, dtype=np.float64)
+        self.header = buffer[:1]
+        self.slots = buffer[1:].reshape(2, SLOT_FIELDS)
+
+    def reset(self):
+        self.slots[:] = 0.0
+        self.header[0] = 0.0
+
+    # 生产者：发布一个带时间戳的样本，x、y为None表示人脸丢失；
+    # 时间戳用time.monotonic()，它是系统范围的单调时钟，主进程和检测子进程的读数可以直接比较
+    def publish(self, timestamp, x=None, y=None):
+        seq = int(self.header[0]) + 1
+        slot = self.slots[seq & 1]
+        # 先把槽位标记为写入中，消费者读到不一致的序号会重读
+        slot[0] = -seq
+        slot[1] = timestamp
+        slot[2] = np.nan if x is None else x
+        slot[3] = np.nan if y is None else y
+        slot[0] = seq
+        self.header[0] = seq
+
+    # 消费者：返回最新样本(序号, 时间戳, x, y)，还没有样本时返回None
+    def latest(self):
+        while True:
+            seq = int(self.header[0])
+            if seq == 0:
+                return None
+            slot = self.slots[seq & 1]
+            sample = slot.copy()
+            # 复制前后槽位序号都没变，说明读取期间生产者没有改写这个槽位
+            if int(sample[0]) == seq and int(slot[0]) == seq:
+                return seq, sample[1], sample[2], sample[3]
@@ -0,0 +1,224 @@
+import time
+from threading import Thread
+from settings import (CAMERA_WIDTH, CAMERA_HEIGHT, GAME_WIDTH, GAME_HEIGHT, FACE_DETECT_SCALE, FACE_ROI_MARGIN,
+                      FACE_MIN_SIZE, FACE_PREVIEW, FACE_SAMPLE_MAX_AGE, FACE_WORKER)
+from face_channel import FaceChannel
+from smoothing import FaceTracker
+
+CAMERA_INDEX = 0
+CASCADE_FILE = "haarcascade_frontalface_alt2.xml"
+PREVIEW_WINDOW = "Camera (Face Control)"
+# 停止时等待检测线程退出的最长时间（秒），摄像头读取卡住时不阻塞游戏退出
+STOP_TIMEOUT = 2.0
+
+
+def map_camera_to_game(camera_x, camera_y):
+    game_x = (CAMERA_WIDTH - camera_x) * (GAME_WIDTH / CAMERA_WIDTH)
+    game_y = camera_y * (GAME_HEIGHT / CAMERA_HEIGHT)
+
+    return game_x, game_y
+
+
+# 打开摄像头，失败时返回None
+def open_camera(camera_index):
+    import cv2
+
+    cap = cv2.VideoCapture(camera_index)
+    if not cap.isOpened():
+        cap.release()
+        return None
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
+    return cap
+
+
+# 人脸检测器：在缩小后的灰度图上检测，并优先在上次人脸附近的区域内跟踪，线程和子进程两种模式共用
+class FaceDetector:
+    def __init__(self, detect_scale=FACE_DETECT_SCALE, roi_margin=FACE_ROI_MARGIN):
+        import cv2
+
+        self.detect_scale = detect_scale
+        self.roi_margin = roi_margin
+        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + CASCADE_FILE)
+
+        # 上一次检测到的人脸，缩小后画面中的(x, y, w, h)
+        self.last_face = None
+        # 每秒完成的检测次数
+        self.detections_per_second = 0.0
+        self.roi_hits = 0
+        self.full_searches = 0
+        self._window_start = time.perf_counter()
+        self._window_count = 0
+
+    # 有上次结果时只搜索其周围的区域，跟丢后再全画面搜索
+    def detect(self, small):
+        min_size = max(1, int(FACE_MIN_SIZE * self.detect_scale))
+
+        if self.last_face is not None:
+            x, y, w, h = self.last_face
+            margin = int(max(w, h) * self.roi_margin)
+            x0, y0 = max(0, x - margin), max(0, y - margin)
+            x1, y1 = min(small.shape[1], x + w + margin), min(small.shape[0], y + h + margin)
+            faces = self.face_cascade.detectMultiScale(small[y0:y1, x0:x1], 1.1, 5, minSize=(min_size, min_size))
+            if len(faces) > 0:
+                self.roi_hits += 1
+                x, y, w, h = max(faces, key=lambda rect: rect[2] * rect[3])
+                return x + x0, y + y0, w, h
+
+        self.full_searches += 1
+        faces = self.face_cascade.detectMultiScale(small, 1.1, 5, minSize=(min_size, min_size))
+        if len(faces) > 0:
+            return tuple(max(faces, key=lambda rect: rect[2] * rect[3]))
+        return None
+
+    # 处理一帧BGR画面，返回人脸中心对应的游戏坐标，没有人脸时返回None
+    def process(self, frame):
+        import cv2
+
+        # 未镜像的画面直接检测，映射坐标时再做水平翻转
+        scale = self.detect_scale
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if scale != 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        self.last_face = self.detect(gray)
+
+        self._window_count += 1
+        now = time.perf_counter()
+        if now - self._window_start >= 1.0:
+            self.detections_per_second = self._window_count / (now - self._window_start)
+            self._window_start = now
+            self._window_count = 0
+
+        if self.last_face is None:
+            return None
+        x, y, w, h = self.last_face
+        return map_camera_to_game((x + w / 2) / scale, (y + h / 2) / scale)
+
+
+# 显示镜像的摄像头预览，按q关闭时返回False
+def show_preview(frame):
+    import cv2
+
+    cv2.imshow(PREVIEW_WINDOW, cv2.flip(frame, 1))
+    return cv2.waitKey(1) & 0xFF != ord('q')
+
+
+def close_preview():
+    import cv2
+
+    try:
+        cv2.destroyAllWindows()
+    except cv2.error:
+        pass
+
+
+# 人脸控制服务：只有在选择人脸控制时才打开摄像头、加载分类器并启动检测，会话结束后释放
+# worker为"thread"时在游戏进程内的线程中检测，为"process"时在独立子进程中采集和检测
+class FaceControlService:
+    def __init__(self, camera_index=CAMERA_INDEX, detect_scale=FACE_DETECT_SCALE, roi_margin=FACE_ROI_MARGIN,
+                 preview=FACE_PREVIEW, worker=FACE_WORKER):
+        self.camera_index = camera_index
+        self.detect_scale = detect_scale
+        self.roi_margin = roi_margin
+        self.preview = preview
+        self.worker = worker
+        self.cap = None
+        self.detector = None
+        self.thread = None
+        self.process = None
+        self.running = False
+
+        # 检测端写入、主循环读取的人脸位置通道，以及主循环侧的滤波器
+        self.channel = FaceChannel()
+        self.tracker = FaceTracker(FACE_SAMPLE_MAX_AGE)
+
+    # 启动服务，摄像头不可用时返回False，由开始界面提示
+    def start(self):
+        if self.running:
+            return True
+
+        self.tracker.reset()
+        if self.worker == "process":
+            from face_process import FaceProcessWorker
+
+            process = FaceProcessWorker(self.camera_index, self.detect_scale, self.roi_margin, self.preview)
+            if not process.start():
+                return False
+            self.process = process
+            self.channel = process.channel
+            self.running = True
+            return True
+
+        # cv2导入较慢，鼠标和键盘模式下不需要，在open_camera中才导入
+        cap = open_camera(self.camera_index)
+        if cap is None:
+            return False
+
+        self.cap = cap
+        self.detector = FaceDetector(self.detect_scale, self.roi_margin)
+        self.channel = FaceChannel()
+        self.running = True
+        self.thread = Thread(target=self.face_detection_thread, daemon=True)
+        self.thread.start()
+        return True
+
+    # 停止检测并释放摄像头
+    def stop(self):
+        self.running = False
+        if self.process is not None:
+            # 先丢弃指向共享内存的通道，子进程退出后共享内存才能释放
+            self.channel = FaceChannel()
+            self.process.stop()
+            self.process = None
+
+        if self.thread is not None:
+            # 摄像头和预览窗口由检测线程退出时自己释放；超时仍未退出（读取卡在cv2中）时不再等待，线程为守护线程
+            self.thread.join(STOP_TIMEOUT)
+            self.thread = None
+            self.cap = None
+            self.detector = None
+
+    # 检测子进程意外退出时重新启动一次；重启也失败时返回True，服务保持停止
+    def worker_lost(self):
+        if self.process is None or self.process.alive():
+            return False
+        self.stop()
+        return not self.start()
+
+    def face_detection_thread(self):
+        cap, detector, channel = self.cap, self.detector, self.channel
+        try:
+            while self.running and cap.isOpened():
+                ret, frame = cap.read()
+                if not ret:
+                    continue
+
+                if self.preview and not show_preview(frame):
+                    break
+
+                pos = detector.process(frame)
+                if pos is not None:
+                    channel.publish(time.monotonic(), pos[0], pos[1])
+                else:
+                    channel.publish(time.monotonic())
+        finally:
+            cap.release()
+            if self.preview:
+                close_preview()
+
+    @property
+    def detections_per_second(self):
+        if self.process is not None:
+            return self.process.detections_per_second
+        if self.detector is not None:
+            return self.detector.detections_per_second
+        return 0.0
+
+    # 主循环读取人脸位置：经过滤波并外推到target_time（time.monotonic()时间），没有人脸或样本过期时返回None
+    def position(self, target_time):
+        if self.process is not None:
+            self.process.heartbeat()
+        return self.tracker.position(self.channel.latest(), time.monotonic(), target_time)
+
+
+face_service = FaceControlService()
@@ -0,0 +1,215 @@
+import os
+import sys
+import time
+import subprocess
+from threading import Thread
+import numpy as np
+from multiprocessing import shared_memory
+from settings import CAMERA_WIDTH, CAMERA_HEIGHT
+from face_channel import FaceChannel, SLOT_FIELDS
+
+# 子进程中的人脸检测：摄像头画面写入共享内存环形缓冲区，检测结果通过共享内存中的FaceChannel传回
+# 子进程用独立的python -m face_process启动，不会重新导入游戏主模块和创建窗口
+
+FRAME_SLOTS = 3
+START_TIMEOUT = 10.0
+STOP_TIMEOUT = 2.0
+# 主进程超过该时长（秒）没有读取位置，子进程认为主进程已退出
+HEARTBEAT_TIMEOUT = 5.0
+
+# 控制块(float64)布局
+CHANNEL_SIZE = 1 + 2 * SLOT_FIELDS
+DPS = CHANNEL_SIZE          # 每秒检测次数
+HEARTBEAT = DPS + 1         # 主进程最近一次读取的时间
+STOP = HEARTBEAT + 1        # 停止标记
+STATUS = STOP + 1           # 0启动中，1运行中，-1摄像头打开失败
+RING_LATEST = STATUS + 1    # 环形缓冲区最新一帧的序号
+RING_SEQS = RING_LATEST + 1  # 每个槽位当前帧的序号，写入中为负数
+CONTROL_SIZE = RING_SEQS + FRAME_SLOTS
+
+FRAME_SHAPE = (CAMERA_HEIGHT, CAMERA_WIDTH, 3)
+
+
+# 共享内存上的画面环形缓冲区，单个写入者（采集线程），读取者只取最新一帧
+class FrameRing:
+    def __init__(self, frames_buffer, control):
+        self.frames = np.ndarray((FRAME_SLOTS,) + FRAME_SHAPE, dtype=np.uint8, buffer=frames_buffer)
+        self.latest = control[RING_LATEST:RING_LATEST + 1]
+        self.seqs = control[RING_SEQS:RING_SEQS + FRAME_SLOTS]
+
+    def write(self, frame):
+        seq = int(self.latest[0]) + 1
+        slot = seq % FRAME_SLOTS
+        self.seqs[slot] = -seq
+        if frame.shape == FRAME_SHAPE:
+            self.frames[slot] = frame
+        else:
+            self.frames[slot] = 0
+            h, w = min(frame.shape[0], FRAME_SHAPE[0]), min(frame.shape[1], FRAME_SHAPE[1])
+            self.frames[slot, :h, :w] = frame[:h, :w]
+        self.seqs[slot] = seq
+        self.latest[0] = seq
+
+    # 返回比after更新的一帧(序号, 画面视图)，没有新帧时返回None
+    def read_latest(self, after):
+        seq = int(self.latest[0])
+        if seq <= after:
+            return None
+        slot = seq % FRAME_SLOTS
+        if int(self.seqs[slot]) != seq:
+            return None
+        return seq, self.frames[slot]
+
+    # 读取者处理完后确认该帧在处理期间没有被覆盖
+    def still_valid(self, seq):
+        return int(self.seqs[seq % FRAME_SLOTS]) == seq
+
+
+def control_array(shm):
+    return np.ndarray((CONTROL_SIZE,), dtype=np.float64, buffer=shm.buf)
+
+
+# 子进程按名字连接共享内存，由主进程负责释放，不交给子进程的资源跟踪器
+def attach_shared_memory(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        from multiprocessing import resource_tracker
+
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+# 主进程侧：创建共享内存、启动并停止检测子进程
+class FaceProcessWorker:
+    def __init__(self, camera_index, detect_scale, roi_margin, preview):
+        self.camera_index = camera_index
+        self.detect_scale = detect_scale
+        self.roi_margin = roi_margin
+        self.preview = preview
+        self.control_shm = None
+        self.frames_shm = None
+        self.control = None
+        self.channel = None
+        self.ring = None
+        self.proc = None
+
+    def start(self):
+        self.control_shm = shared_memory.SharedMemory(create=True, size=CONTROL_SIZE * 8)
+        self.frames_shm = shared_memory.SharedMemory(create=True, size=FRAME_SLOTS * int(np.prod(FRAME_SHAPE)))
+        self.control = control_array(self.control_shm)
+        self.control[:] = 0.0
+        self.channel = FaceChannel(self.control[:CHANNEL_SIZE])
+        self.ring = FrameRing(self.frames_shm.buf, self.control)
+        self.heartbeat()
+
+        args = [sys.executable, "-m", "face_process", self.control_shm.name, self.frames_shm.name,
+                str(self.camera_index), str(self.detect_scale), str(self.roi_margin), str(int(self.preview))]
+        self.proc = subprocess.Popen(args, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+        deadline = time.monotonic() + START_TIMEOUT
+        while self.control[STATUS] == 0 and self.proc.poll() is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        if self.control[STATUS] != 1:
+            self.stop()
+            return False
+        return True
+
+    # 子进程是否仍在运行；主循环卡住超过HEARTBEAT_TIMEOUT后子进程会自行退出
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def heartbeat(self):
+        self.control[HEARTBEAT] = time.monotonic()
+
+    @property
+    def detections_per_second(self):
+        return float(self.control[DPS]) if self.control is not None else 0.0
+
+    def stop(self):
+        if self.proc is not None:
+            self.control[STOP] = 1.0
+            try:
+                self.proc.wait(STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+            self.proc = None
+
+        # 释放共享内存前先丢弃所有指向它的数组视图
+        self.channel = None
+        self.ring = None
+        self.control = None
+        for shm in (self.control_shm, self.frames_shm):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self.control_shm = None
+        self.frames_shm = None
+
+
+# 子进程侧：采集线程只负责把画面写入环形缓冲区，检测循环始终处理最新一帧
+def worker_main(control_name, frames_name, camera_index, detect_scale, roi_margin, preview):
+    from face_control import open_camera, FaceDetector, show_preview, close_preview
+
+    control_shm = attach_shared_memory(control_name)
+    frames_shm = attach_shared_memory(frames_name)
+    control = control_array(control_shm)
+    channel = FaceChannel(control[:CHANNEL_SIZE])
+    ring = FrameRing(frames_shm.buf, control)
+
+    cap = open_camera(camera_index)
+    if cap is None:
+        control[STATUS] = -1
+    else:
+        detector = FaceDetector(detect_scale, roi_margin)
+        control[STATUS] = 1
+
+        def running():
+            return control[STOP] == 0 and time.monotonic() - control[HEARTBEAT] < HEARTBEAT_TIMEOUT
+
+        def capture():
+            while running() and cap.isOpened():
+                ret, frame = cap.read()
+                if ret:
+                    ring.write(frame)
+
+        capture_thread = Thread(target=capture, daemon=True)
+        capture_thread.start()
+
+        last_seq = 0
+        while running():
+            latest = ring.read_latest(last_seq)
+            if latest is None:
+                time.sleep(0.002)
+                continue
+            last_seq, frame = latest
+
+            if preview and not show_preview(frame):
+                break
+
+            pos = detector.process(frame)
+            # 处理期间该槽位被采集线程覆盖时，结果可能来自混合画面，直接丢弃
+            if not ring.still_valid(last_seq):
+                continue
+            if pos is not None:
+                channel.publish(time.monotonic(), pos[0], pos[1])
+            else:
+                channel.publish(time.monotonic())
+            control[DPS] = detector.detections_per_second
+
+        control[STOP] = 1.0
+        capture_thread.join(STOP_TIMEOUT)
+        cap.release()
+        if preview:
+            close_preview()
+
+    del channel, ring, control
+    control_shm.close()
+    frames_shm.close()
+
+
+if __name__ == "__main__":
+    worker_main(sys.argv[1], sys.argv[2], int(sys.argv[3]), float(sys.argv[4]), float(sys.argv[5]),
+                sys.argv[6] == "1")
@@ -1,247 +1,203 @@
-import pygame
-import random
+import os
 import time
-import cv2
-from pygame.constants import (K_SPACE, K_m, K_k, K_f, K_ESCAPE, K_a, K_d, K_s, K_w, K_LEFT, K_RIGHT, K_UP, K_DOWN)
-from resource_load import (myFont, COLORS, score_font, info_font, bg0, start, NORMAL_TO_BOSS1,BOSS1_TO_BOSS2, enemy_images, FPS, bg1, plane, boss_1_img, boss_2_img, CAMERA_WIDTH, CAMERA_HEIGHT, GAME_HEIGHT, GAME_WIDTH)
-from high_score import save_high_score, load_high_score
-from threading import Thread
-from collections import deque
-
-# 摄像头设置
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_alt2.xml")
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    print("无法打开摄像头")
-    exit()
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-
-# 人脸检测线程
-face_detection_running = True
-current_face_pos = None
-face_positions = deque(maxlen=5)
-
-
-def map_camera_to_game(camera_x, camera_y):
-    game_x = (CAMERA_WIDTH - camera_x) * (GAME_WIDTH / CAMERA_WIDTH)
-    game_y = camera_y * (GAME_HEIGHT / CAMERA_HEIGHT)
-
-    return game_x, game_y
-
-
-def face_detection_thread():
-    global current_face_pos
-    while face_detection_running and cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            continue
+import pygame
+from pygame.constants import (K_SPACE, K_m, K_k, K_f, K_ESCAPE, K_a, K_d, K_s, K_w, K_LEFT, K_RIGHT, K_UP, K_DOWN,
+                              K_F3, K_F11)
+from resource_load import (COLORS, fonts, sprites, asset_loader, load_fonts, convert_sprites, get_scaled_sprites,
+                           get_scaled_fonts, scale_surface, invalidate_scaled_sprites, collision_masks, FPS,
+                           GAME_HEIGHT, GAME_WIDTH)
+from high_score import high_scores
+from game_logic import InputCommand, init_game_variables, update_game_state, check_collisions
+from game_state import Rules
+from game_events import FaceControlLost
+from dirty_rect import DirtyRectTracker
+from text_cache import render_text, HudText
+from settings import (DIRTY_RECT_RENDERING, FACE_PREDICTION_LEAD, PROFILER_OVERLAY, PROFILE_TRACE_FILE,
+                      REPLAY_RECORD_DIR, TICK_RATE, MAX_FRAME_TIME, MENU_EVENT_TIMEOUT, WINDOW_SIZE, FULLSCREEN,
+                      COLLISION_MODE)
+from face_control import face_service
+from profiler import FrameProfiler
+from replay import InputRecorder
+from event_log import event_log
+from viewport import Viewport
+
+screen = None
+fullscreen = False
+viewport = Viewport()
+# 加载界面的刷新间隔（秒）
+SPLASH_FRAME_TIME = 1 / 30
+frame_renderer = DirtyRectTracker(enabled=DIRTY_RECT_RENDERING)
+
+
+# 创建或调整游戏窗口，之后按新的缩放比例重新准备精灵并整屏重绘
+def set_display_mode(size, use_fullscreen=False):
+    global screen, fullscreen
+    fullscreen = use_fullscreen
+    if use_fullscreen:
+        screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    else:
+        screen = pygame.display.set_mode(size, pygame.RESIZABLE)
+    viewport.update(screen.get_size())
+    invalidate_scaled_sprites()
+    frame_renderer.invalidate()
 
-        # 显示摄像头窗口
-        frame = cv2.flip(frame, 1)
-        cv2.imshow("Camera (Face Control)", frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-
-        # 检测人脸
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, 1.1, 5, minSize=(50, 50))
-
-        if len(faces) > 0:
-            main_face = max(faces, key=lambda rect: rect[2] * rect[3])
-            x, y, w, h = main_face
-            face_center_x, face_center_y = x + w // 2, y + h // 2
-            game_x, game_y = map_camera_to_game(CAMERA_WIDTH - face_center_x, face_center_y)
-            current_face_pos = (game_x, game_y)
-            face_positions.append((game_x, game_y))
-        else:
-            current_face_pos = None
-            face_positions.clear()
 
+# 处理窗口大小改变和F11全屏切换，处理了返回True
+def handle_window_event(event):
+    if event.type == pygame.VIDEORESIZE and not fullscreen:
+        set_display_mode(event.size)
+        return True
+    if event.type == pygame.KEYDOWN and event.key == K_F11:
+        set_display_mode(WINDOW_SIZE, not fullscreen)
+        return True
+    return False
 
-# 启动人脸检测线程
-face_thread = Thread(target=face_detection_thread, daemon=True)
-face_thread.start()
 
 # 创建游戏窗口
-screen = pygame.display.set_mode((GAME_WIDTH, GAME_HEIGHT))
+pygame.init()
+set_display_mode(WINDOW_SIZE, FULLSCREEN)
 pygame.display.set_caption("智能雷电")
+# 菜单界面先画在逻辑尺寸的画布上，再整体缩放到窗口
+canvas = pygame.Surface((GAME_WIDTH, GAME_HEIGHT)).convert()
 
 
-# 碰撞检测函数
-def get_center_and_radius(rect, radius):
-    if isinstance(rect, (tuple, list)):
-        x, y, w, h = rect
-        center = (x + w / 2, y + h / 2)
-        r = radius if radius is not None else min(w, h) / 2
+# 把画布显示到窗口中
+def present_canvas():
+    if viewport.scale == 1.0 and viewport.rect == screen.get_rect():
+        screen.blit(canvas, (0, 0))
     else:
-        center = (rect.x + rect.width / 2, rect.y + rect.height / 2)
-        r = radius if radius is not None else min(rect.width, rect.height) / 2
-    return center, r
-
-
-def check_collision(rect1, rect2, radius1=None, radius2=None):
-    center1, r1 = get_center_and_radius(rect1, radius1)
-    center2, r2 = get_center_and_radius(rect2, radius2)
-    dx, dy = center1[0] - center2[0], center1[1] - center2[1]
-    distance_squared = dx * dx + dy * dy
-    radius_sum = r1 + r2
-    return distance_squared <= radius_sum * radius_sum
-
-
-# 显示游戏结束界面
-def show_game_over(score, high_score):
-    screen.fill(COLORS["BLACK"])
-
-    if score > high_score:
-        high_score = score
-        save_high_score(score)
-
-    title = myFont.render("游戏结束", True, COLORS["RED"])
-    score_text = score_font.render(f"最终得分: {int(score)}", True, COLORS["WHITE"])
-    high_score_text = score_font.render(f"最高分: {high_score}", True, COLORS["WHITE"])
-    restart_text = info_font.render("按空格键或鼠标左键重新开始", True, COLORS["WHITE"])
+        screen.fill(COLORS["BLACK"])
+        screen.blit(pygame.transform.smoothscale(canvas, viewport.rect.size), viewport.rect)
+    pygame.display.update()
 
-    screen.blit(title, (GAME_WIDTH // 2 - title.get_width() // 2, GAME_HEIGHT // 2 - 150))
-    screen.blit(score_text, (GAME_WIDTH // 2 - score_text.get_width() // 2, GAME_HEIGHT // 2 - 50))
-    screen.blit(high_score_text, (GAME_WIDTH // 2 - high_score_text.get_width() // 2, GAME_HEIGHT // 2 + 50))
-    screen.blit(restart_text, (GAME_WIDTH // 2 - restart_text.get_width() // 2, GAME_HEIGHT // 2 + 150))
 
-    pygame.display.update()
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.KEYDOWN:
-                if event.key == K_SPACE:
-                    return "restart"
-                elif event.key == K_ESCAPE:
-                    return "quit"
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:
-                    return "restart"
-            elif event.type == pygame.QUIT:
+# 加载界面：资源在后台线程中加载，这里只画进度条（不用字体，字体在加载完成后于主线程创建），
+# 关闭窗口的事件留在队列中，加载完成后由开始界面处理
+def show_splash():
+    bar = pygame.Rect(GAME_WIDTH // 4, GAME_HEIGHT // 2 - 8, GAME_WIDTH // 2, 16)
+    while True:
+        finished = asset_loader.wait(SPLASH_FRAME_TIME)
+        for event in pygame.event.get(exclude=pygame.QUIT):
+            handle_window_event(event)
+        canvas.fill(COLORS["BLACK"])
+        pygame.draw.rect(canvas, COLORS["WHITE"], bar, 1)
+        fill = bar.inflate(-4, -4)
+        fill.width = int(fill.width * (1.0 if finished else asset_loader.progress()))
+        pygame.draw.rect(canvas, COLORS["WHITE"], fill)
+        present_canvas()
+        if finished:
+            return
+
+
+show_splash()
+load_fonts()
+convert_sprites()
+
+
+# 界面需要重绘的窗口事件（窗口被遮挡后重新露出、从最小化恢复等）
+REDRAW_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN, pygame.WINDOWRESTORED)
+
+
+# 菜单类界面的事件循环：阻塞等待事件而不是空转，只在draw被要求时重绘
+# handle_event返回None表示继续等待，返回"redraw"表示界面内容有变化，其余值作为结果返回
+def run_menu(draw, handle_event):
+    # 丢弃对局中残留的按键，避免连按开火键时直接跳过结束界面
+    pygame.event.clear((pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN))
+    draw()
+    present_canvas()
+    while True:
+        event = pygame.event.wait(MENU_EVENT_TIMEOUT)
+        if event.type == pygame.NOEVENT:
+            continue
+        if event.type in REDRAW_EVENTS or handle_window_event(event):
+            result = "redraw"
+        else:
+            result = handle_event(event)
+        if result == "redraw":
+            draw()
+            present_canvas()
+        elif result is not None:
+            return result
+
+
+# 显示游戏结束界面，rank为本局在该控制方式排行榜中的名次
+def show_game_over(score, high_score, rank=None):
+    title = render_text(fonts["large"], "游戏结束", COLORS["RED"])
+    score_text = render_text(fonts["medium"], f"最终得分: {int(score)}", COLORS["WHITE"])
+    high_score_text = render_text(fonts["medium"], f"最高分: {high_score}", COLORS["WHITE"])
+    restart_text = render_text(fonts["small"], "按空格键或鼠标左键重新开始", COLORS["WHITE"])
+    rank_text = render_text(fonts["small"], f"排行榜第{rank}名", COLORS["YELLOW"]) if rank is not None else None
+
+    def draw():
+        canvas.fill(COLORS["BLACK"])
+        canvas.blit(title, (GAME_WIDTH // 2 - title.get_width() // 2, GAME_HEIGHT // 2 - 150))
+        canvas.blit(score_text, (GAME_WIDTH // 2 - score_text.get_width() // 2, GAME_HEIGHT // 2 - 50))
+        canvas.blit(high_score_text, (GAME_WIDTH // 2 - high_score_text.get_width() // 2, GAME_HEIGHT // 2 + 50))
+        if rank_text is not None:
+            canvas.blit(rank_text, (GAME_WIDTH // 2 - rank_text.get_width() // 2, GAME_HEIGHT // 2 + 100))
+        canvas.blit(restart_text, (GAME_WIDTH // 2 - restart_text.get_width() // 2, GAME_HEIGHT // 2 + 150))
+
+    def handle_event(event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == K_SPACE:
+                return "restart"
+            elif event.key == K_ESCAPE:
                 return "quit"
-        pygame.time.wait(10)
-    return "quit"
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:
+                return "restart"
+        elif event.type == pygame.QUIT:
+            return "quit"
+        return None
+
+    return run_menu(draw, handle_event)
 
 
 # 显示开始界面
 def show_start_screen():
-    screen.blit(bg0, (0, 0))
-    high_score = load_high_score()
+    high_score = high_scores.high_score()
 
-    title = myFont.render("智能雷电", True, COLORS["RED"])
-    high_score_text = score_font.render(f"最高分: {high_score}", True, COLORS["WHITE"])
+    title = render_text(fonts["large"], "智能雷电", COLORS["RED"])
+    high_score_text = render_text(fonts["medium"], f"最高分: {high_score}", COLORS["WHITE"])
     instructions = [
-        info_font.render("游戏说明：WASD或上下左右控制方向", True, COLORS["BLACK"]),
-        info_font.render("空格键或左键发射导弹", True, COLORS["BLACK"]),
-        info_font.render("按M键使用鼠标控制开始游戏", True, COLORS["BLACK"]),
-        info_font.render("按K键使用键盘控制开始游戏", True, COLORS["BLACK"]),
-        info_font.render("按F键使用人脸控制开始游戏", True, COLORS["BLACK"]),
+        render_text(fonts["small"], "游戏说明：WASD或上下左右控制方向", COLORS["BLACK"]),
+        render_text(fonts["small"], "空格键或左键发射导弹", COLORS["BLACK"]),
+        render_text(fonts["small"], "按M键使用鼠标控制开始游戏", COLORS["BLACK"]),
+        render_text(fonts["small"], "按K键使用键盘控制开始游戏", COLORS["BLACK"]),
+        render_text(fonts["small"], "按F键使用人脸控制开始游戏", COLORS["BLACK"]),
     ]
-
-    screen.blit(title, (166, 100))
-    screen.blit(high_score_text, (GAME_WIDTH // 2 - high_score_text.get_width() // 2, 200))
-    for i, inst in enumerate(instructions):
-        screen.blit(inst, (50, 350 + i * 40))
-    screen.blit(start, (187, 540))
-
-    running = True
-    selected_control = -1
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.KEYDOWN:
-                if event.key == K_m:
-                    selected_control = 0  # 鼠标控制
-                    running = False
-                elif event.key == K_k:
-                    selected_control = 1  # 键盘控制
-                    running = False
-                elif event.key == K_f:
-                    selected_control = 2  # 人脸控制
-                    running = False
-                elif event.key == K_ESCAPE:
-                    return -1
-            elif event.type == pygame.QUIT:
+    camera_error = render_text(fonts["small"], "无法打开摄像头", COLORS["RED"])
+    state = {"camera_failed": False}
+
+    def draw():
+        canvas.blit(sprites["bg0"], (0, 0))
+        canvas.blit(title, (166, 100))
+        canvas.blit(high_score_text, (GAME_WIDTH // 2 - high_score_text.get_width() // 2, 200))
+        for i, inst in enumerate(instructions):
+            canvas.blit(inst, (50, 350 + i * 40))
+        canvas.blit(sprites["start"], (187, 540))
+        if state["camera_failed"]:
+            canvas.blit(camera_error, (GAME_WIDTH // 2 - camera_error.get_width() // 2, 300))
+
+    def handle_event(event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == K_m:
+                return 0  # 鼠标控制
+            elif event.key == K_k:
+                return 1  # 键盘控制
+            elif event.key == K_f:
+                # 摄像头只在选择人脸控制时打开，打不开时留在开始界面并提示
+                if face_service.start():
+                    return 2  # 人脸控制
+                state["camera_failed"] = True
+                return "redraw"
+            elif event.key == K_ESCAPE:
                 return -1
-        pygame.display.update()
-
-    return selected_control
-
-
-# 初始化游戏变量
-def init_game_variables(control_type):
-    clock = pygame.time.Clock()
+        elif event.type == pygame.QUIT:
+            return -1
+        return None
 
-    game_vars = {
-        'normal_enemy_killed': 0,
-        'boss1_killed': 0,
-        'boss2_killed': 0,
-        'speed_multiplier': 1.0,
-        'boss_escape_timer': 0,
-        'score': 0,
-
-        'current_boss': None,
-        'boss_active': False,
-        'enemy_active': False,
-        'game_over': False,
-
-        'plane_w': 100, 'plane_h': 148,
-        'plane_x': float((GAME_WIDTH - 100) / 2),
-        'plane_y': float(GAME_HEIGHT - 148 - 20),
-        'max_speed': 8.0,
-        'acceleration': 1.0,
-        'deceleration': 0.8,
-        'move_speed': 0.0,
-
-        'enemy_w': 128, 'enemy_h': 128,
-        'enemy_x': 0, 'enemy_y': 0,
-        'enemy_img': None,
-        'enemy_speed': 2.0,
-        'enemy_spawn_time': 0,
-        'enemy_alive_time': 0,
-
-        'bullet_img': pygame.image.load("alien_bullet.png"),
-        'bullet_w': 44, 'bullet_h': 48,
-        'bullet_x': 0, 'bullet_y': 0,
-        'bullet_speed': 5.0,
-        'bullet_active': False,
-        'last_bullet_time': 0,
-        'bullet_cooldown': 2,
-        'bullet_delay': random.uniform(0.5, 1.5),
-        'can_shoot': False,
-
-        'missile_img': pygame.image.load("feidan.png"),
-        'missile_w': 21, 'missile_h': 59,
-        'missile_x': 0, 'missile_y': -59,
-        'missile_speed': 10.0,
-        'missile_active': False,
-
-        'boss_1_w': 270, 'boss_1_h': 175,
-        'boss_2_w': 577 // 2, 'boss_2_h': 374 // 2,
-        'boss_x': 0, 'boss_y': 0,
-        'boss_speed': 1.0,
-        'boss_health': 100,
-        'boss_max_health': 100,
-
-        'control_type': control_type,
-        'crosshair': create_crosshair(),
-
-        'combo_window': 0.5,
-        'hit_times': [],
-        'combo_count': 0,
-        'last_combo_score_time': 0,
-
-        'clock': clock,
-        'current_time': 0,
-        'show_camera': control_type == 2,
-    }
-
-    game_vars['enemy_x'] = random.randint(0, GAME_WIDTH - game_vars['enemy_w'])
-    game_vars['enemy_y'] = -game_vars['enemy_h']
-    game_vars['enemy_img'] = enemy_images[random.randint(0, 4)]
-
-    return clock, game_vars
+    return run_menu(draw, handle_event)
 
 
 # 创建鼠标准星
@@ -256,400 +212,256 @@ def create_crosshair():
     return crosshair
 
 
-# 处理游戏事件
+crosshair = create_crosshair()
+# 按窗口缩放比例缩放后的准星，只保留当前一份
+scaled_crosshair = {}
+
+
+def get_scaled_crosshair(scale):
+    if scale == 1.0:
+        return crosshair
+    surface = scaled_crosshair.get(scale)
+    if surface is None:
+        scaled_crosshair.clear()
+        surface = scaled_crosshair[scale] = scale_surface(crosshair, scale)
+    return surface
+
+
+# HUD文字，只在分数、连击数、控制方式变化时重新渲染
+CONTROL_TEXTS = {
+    0: "鼠标控制",
+    1: "键盘控制",
+    2: "人脸控制"
+}
+score_hud = HudText(fonts["medium"], "分数: {}", COLORS["WHITE"])
+combo_hud = HudText(fonts["small"], "连击: {}", (255, 215, 0))
+control_hud = HudText(fonts["small"], "{}", COLORS["YELLOW"])
+
+# 逐帧分阶段计时
+profiler = FrameProfiler(1 / (FPS or TICK_RATE), record=PROFILE_TRACE_FILE is not None)
+profiler.overlay = PROFILER_OVERLAY
+
+
+# 处理游戏事件，并把本帧的键盘、鼠标、人脸输入整理成逻辑指令
 def handle_events(game_vars):
     running = True
+    fire = False
     for event in pygame.event.get():
         if event.type == pygame.KEYDOWN:
             if event.key == K_ESCAPE:
                 running = False
-            elif event.key == K_SPACE and not game_vars['missile_active']:
-                game_vars['missile_x'] = game_vars['plane_x'] + (game_vars['plane_w'] - game_vars['missile_w']) / 2
-                game_vars['missile_y'] = game_vars['plane_y'] - game_vars['missile_h']
-                game_vars['missile_active'] = True
+            elif event.key == K_SPACE:
+                fire = True
+            elif event.key == K_F3:
+                profiler.toggle_overlay()
+                frame_renderer.invalidate()
+            else:
+                handle_window_event(event)
 
         elif event.type == pygame.MOUSEBUTTONDOWN:
-            if event.button == 1 and not game_vars['missile_active']:
-                game_vars['missile_x'] = game_vars['plane_x'] + (game_vars['plane_w'] - game_vars['missile_w']) / 2
-                game_vars['missile_y'] = game_vars['plane_y'] - game_vars['missile_h']
-                game_vars['missile_active'] = True
+            if event.button == 1:
+                fire = True
 
         elif event.type == pygame.QUIT:
             running = False
-    return running
-
-
-# 更新游戏状态
-def update_game_state(game_vars):
-    game_vars['current_time'] = time.time()
-
-    if game_vars['enemy_active']:
-        game_vars['enemy_alive_time'] = game_vars['current_time'] - game_vars['enemy_spawn_time']
-
-    update_combo_system(game_vars)
-    mouse_x, mouse_y = pygame.mouse.get_pos()
-    update_player_position(game_vars, mouse_x, mouse_y)
-    spawn_enemies(game_vars)
-    update_enemies_and_bullets(game_vars)
-    update_boss_logic(game_vars)
-
-    if game_vars['missile_active']:
-        game_vars['missile_y'] -= game_vars['missile_speed'] * game_vars['speed_multiplier']
-        if game_vars['missile_y'] < -game_vars['missile_h']:
-            game_vars['missile_active'] = False
-
-
-# 更新连击系统
-def update_combo_system(game_vars):
-    while game_vars['hit_times'] and game_vars['current_time'] - game_vars['hit_times'][0] > game_vars['combo_window']:
-        game_vars['hit_times'].pop(0)
-
-    if len(game_vars['hit_times']) >= 2:
-        if game_vars['hit_times'][-1] - game_vars['hit_times'][-2] <= game_vars['combo_window']:
-            if game_vars['current_time'] - game_vars['last_combo_score_time'] > game_vars['combo_window']:
-                game_vars['score'] += 1
-                game_vars['combo_count'] += 1
-                game_vars['last_combo_score_time'] = game_vars['current_time']
-                print(f"连击成功! 当前分数: {int(game_vars['score'])} (连击数: {game_vars['combo_count']})")
-
-
-# 更新玩家位置
-def update_player_position(game_vars, mouse_x, mouse_y):
-    if game_vars['control_type'] == 0:  # 鼠标控制
-        target_x = mouse_x - game_vars['plane_w'] / 2
-        target_y = mouse_y - game_vars['plane_h'] / 2
-        game_vars['plane_x'] = max(0, min(target_x, GAME_WIDTH - game_vars['plane_w']))
-        game_vars['plane_y'] = max(0, min(target_y, GAME_HEIGHT - game_vars['plane_h']))
-
-    elif game_vars['control_type'] == 1:  # 键盘控制
-        keys = pygame.key.get_pressed()
-        moving_left = keys[K_a] or keys[K_LEFT]
-        moving_right = keys[K_d] or keys[K_RIGHT]
-        moving_up = keys[K_w] or keys[K_UP]
-        moving_down = keys[K_s] or keys[K_DOWN]
-
-        current_max_speed = game_vars['max_speed'] * game_vars['speed_multiplier']
-        current_acceleration = game_vars['acceleration'] * game_vars['speed_multiplier']
-        current_deceleration = game_vars['deceleration'] * game_vars['speed_multiplier']
-
-        if moving_left and not moving_right:
-            game_vars['move_speed'] = max(game_vars['move_speed'] - current_acceleration, -current_max_speed)
-        elif moving_right and not moving_left:
-            game_vars['move_speed'] = min(game_vars['move_speed'] + current_acceleration, current_max_speed)
-        else:
-            if game_vars['move_speed'] > 0:
-                game_vars['move_speed'] = max(game_vars['move_speed'] - current_deceleration, 0)
-            elif game_vars['move_speed'] < 0:
-                game_vars['move_speed'] = min(game_vars['move_speed'] + current_deceleration, 0)
-
-        game_vars['plane_x'] += game_vars['move_speed']
-        game_vars['plane_x'] = max(0, min(game_vars['plane_x'], GAME_WIDTH - game_vars['plane_w']))
-
-        if moving_up and not moving_down:
-            game_vars['plane_y'] = max(game_vars['plane_y'] - current_max_speed * 0.7, 0)
-        elif moving_down and not moving_up:
-            game_vars['plane_y'] = min(game_vars['plane_y'] + current_max_speed * 0.7,
-                                       GAME_HEIGHT - game_vars['plane_h'])
-
-    elif game_vars['control_type'] == 2:  # 人脸控制
-        if current_face_pos and face_positions:
-            # 使用最近5个位置的平均值来平滑移动
-            avg_x = sum(pos[0] for pos in face_positions) // len(face_positions)
-            avg_y = sum(pos[1] for pos in face_positions) // len(face_positions)
-
-            # 将飞机的中心点对准人脸中心点
-            target_x = avg_x - game_vars['plane_w'] / 2
-            target_y = avg_y - game_vars['plane_h'] / 2
-            target_x = max(0, min(target_x, GAME_WIDTH - game_vars['plane_w']))
-            target_y = max(0, min(target_y, GAME_HEIGHT - game_vars['plane_h']))
-
-            # 平滑移动到目标位置
-            game_vars['plane_x'] += (target_x - game_vars['plane_x']) * 0.2
-            game_vars['plane_y'] += (target_y - game_vars['plane_y']) * 0.2
-            game_vars['plane_x'] = max(0, min(game_vars['plane_x'], GAME_WIDTH - game_vars['plane_w']))
-            game_vars['plane_y'] = max(0, min(game_vars['plane_y'], GAME_HEIGHT - game_vars['plane_h']))
-
-
-# 生成敌人逻辑
-def spawn_enemies(game_vars):
-    if not game_vars['enemy_active'] and not game_vars['boss_active']:
-        if game_vars['normal_enemy_killed'] >= NORMAL_TO_BOSS1 and game_vars['boss1_killed'] < BOSS1_TO_BOSS2:
-            if game_vars['current_boss'] != 1:
-                game_vars['current_boss'] = 1
-                game_vars['boss_active'] = True
-                game_vars['boss_x'] = (GAME_WIDTH - game_vars['boss_1_w']) // 2
-                game_vars['boss_y'] = -game_vars['boss_1_h']
-                game_vars['boss_health'] = 100
-                game_vars['boss_max_health'] = game_vars['boss_health']
-                print(f"Boss1生成！进度: {game_vars['boss1_killed']}/{BOSS1_TO_BOSS2}")
-        elif game_vars['boss1_killed'] >= BOSS1_TO_BOSS2:
-            if game_vars['current_boss'] != 2:
-                game_vars['current_boss'] = 2
-                game_vars['boss_active'] = True
-                game_vars['boss_x'] = (GAME_WIDTH - game_vars['boss_2_w']) // 2
-                game_vars['boss_y'] = -game_vars['boss_2_h']
-                game_vars['boss_health'] = 200
-                game_vars['boss_max_health'] = game_vars['boss_health']
-                print(f"Boss2生成！击落后将提升速度")
+
+        elif event.type in REDRAW_EVENTS or event.type == pygame.VIDEORESIZE:
+            if not handle_window_event(event):
+                frame_renderer.invalidate()
+
+    keys = pygame.key.get_pressed()
+    face = None
+    if game_vars.control_type == 2:
+        if face_service.worker_lost():
+            # 检测进程退出后重启失败（如摄像头被占用或拔出），本局剩余时间改用键盘控制
+            game_vars.control_type = 1
+            game_vars.events.emit(FaceControlLost(game_vars.clock.tick))
         else:
-            game_vars['enemy_active'] = True
-            game_vars['enemy_x'] = random.randint(0, GAME_WIDTH - game_vars['enemy_w'])
-            game_vars['enemy_y'] = -game_vars['enemy_h']
-            game_vars['enemy_img'] = enemy_images[random.randint(0, 4)]
-            game_vars['enemy_spawn_time'] = game_vars['current_time']
-            game_vars['can_shoot'] = False
-            game_vars['bullet_delay'] = random.uniform(0.5, 1.5)
-            print(f"普通敌机生成！还需{NORMAL_TO_BOSS1 - game_vars['normal_enemy_killed']}架到Boss1")
-
-
-# 更新敌机和子弹位置
-def update_enemies_and_bullets(game_vars):
-    if game_vars['enemy_active']:
-        game_vars['enemy_y'] += game_vars['enemy_speed'] * game_vars['speed_multiplier']
-
-        if game_vars['enemy_y'] > GAME_HEIGHT:
-            game_vars['score'] -= 1
-            print(f"普通敌机逃脱！当前分数: {int(game_vars['score'])}")
-            game_vars['enemy_active'] = False
-
-        if not game_vars['can_shoot'] and game_vars['enemy_alive_time'] >= game_vars['bullet_delay']:
-            game_vars['can_shoot'] = True
-
-        if game_vars['bullet_active']:
-            game_vars['bullet_y'] += game_vars['bullet_speed'] * game_vars['speed_multiplier']
-            if game_vars['bullet_y'] > GAME_HEIGHT:
-                game_vars['bullet_active'] = False
-
-        if (game_vars['can_shoot'] and not game_vars['bullet_active'] and
-                (game_vars['current_time'] - game_vars['last_bullet_time']) >= game_vars['bullet_cooldown']):
-            if random.random() < 0.7:
-                game_vars['bullet_x'] = game_vars['enemy_x'] + game_vars['enemy_w'] / 2 - game_vars['bullet_w'] / 2
-                game_vars['bullet_y'] = game_vars['enemy_y'] + game_vars['enemy_h']
-                game_vars['bullet_active'] = True
-                game_vars['last_bullet_time'] = game_vars['current_time']
-
-
-# 更新Boss逻辑
-def update_boss_logic(game_vars):
-    if game_vars['boss_active']:
-        game_vars['boss_y'] += game_vars['boss_speed'] * game_vars['speed_multiplier']
-
-        if game_vars['boss_y'] > 100:
-            game_vars['boss_y'] = 100
-            game_vars['boss_escape_timer'] += 1 / FPS
-
-            if game_vars['boss_escape_timer'] > 5:
-                escaping_boss_type = game_vars['current_boss']
-                game_vars['boss_active'] = False
-                game_vars['boss_escape_timer'] = 0
-                game_vars['current_boss'] = None
-                game_vars['bullet_active'] = False
-                game_vars['can_shoot'] = False
-
-                if escaping_boss_type == 1:
-                    game_vars['score'] -= 10
-                    print("Boss1逃跑！分数-10")
-                elif escaping_boss_type == 2:
-                    game_vars['score'] -= 20
-                    print("Boss2逃跑！分数-20")
-
-                game_vars['normal_enemy_killed'] = 0
-                if escaping_boss_type == 2:
-                    game_vars['boss1_killed'] = 0
-
-        if game_vars['bullet_active']:
-            game_vars['bullet_y'] += game_vars['bullet_speed'] * game_vars['speed_multiplier']
-            if game_vars['bullet_y'] > GAME_HEIGHT:
-                game_vars['bullet_active'] = False
-                game_vars['can_shoot'] = False
-
-        if game_vars['boss_health'] <= 0:
-            if game_vars['current_boss'] == 1:
-                game_vars['boss1_killed'] += 1
-                game_vars['normal_enemy_killed'] = 0
-                print(f"Boss1被击落！进度: {game_vars['boss1_killed']}/{BOSS1_TO_BOSS2}")
-            elif game_vars['current_boss'] == 2:
-                game_vars['boss2_killed'] += 1
-                game_vars['speed_multiplier'] *= 1.5
-                game_vars['normal_enemy_killed'] = 0
-                game_vars['boss1_killed'] = 0
-                print(f"Boss2被击落！速度提升至{game_vars['speed_multiplier']:.1f}x")
-
-            game_vars['boss_active'] = False
-            game_vars['current_boss'] = None
-            game_vars['boss_escape_timer'] = 0
-            game_vars['bullet_active'] = False
-            game_vars['can_shoot'] = False
-
-
-# 碰撞检测
-def check_collisions(game_vars):
-    player_rect = pygame.Rect(int(game_vars['plane_x']), int(game_vars['plane_y']),
-                              game_vars['plane_w'], game_vars['plane_h'])
-
-    missile_rect = pygame.Rect(int(game_vars['missile_x']), int(game_vars['missile_y']),
-                               game_vars['missile_w'], game_vars['missile_h']) if game_vars['missile_active'] else None
-
-    bullet_rect = pygame.Rect(game_vars['bullet_x'], game_vars['bullet_y'],
-                              game_vars['bullet_w'], game_vars['bullet_h']) if game_vars['bullet_active'] else None
-
-    missile_hit = False
-
-    # Boss碰撞检测
-    if game_vars['boss_active']:
-        boss_rect = pygame.Rect(
-            game_vars['boss_x'], game_vars['boss_y'],
-            game_vars['boss_1_w'] if game_vars['current_boss'] == 1 else game_vars['boss_2_w'],
-            game_vars['boss_1_h'] if game_vars['current_boss'] == 1 else game_vars['boss_2_h']
-        )
-        boss_radius = min(game_vars['boss_1_w'], game_vars['boss_1_h']) / 2 if game_vars['current_boss'] == 1 else min(
-            game_vars['boss_2_w'], game_vars['boss_2_h']) / 2
-
-        if check_collision(player_rect, boss_rect, radius2=boss_radius):
-            print("玩家与Boss碰撞！游戏结束")
-            game_vars['game_over'] = True
-
-    # 普通敌机碰撞检测
-    if game_vars['enemy_active']:
-        enemy_rect = pygame.Rect(game_vars['enemy_x'], game_vars['enemy_y'],
-                                 game_vars['enemy_w'], game_vars['enemy_h'])
-
-        if game_vars['missile_active'] and missile_rect:
-            if check_collision(missile_rect, enemy_rect, radius2=min(game_vars['enemy_w'], game_vars['enemy_h']) / 2):
-                game_vars['score'] += 2
-                game_vars['normal_enemy_killed'] += 1
-                game_vars['enemy_active'] = False
-                missile_hit = True
-                game_vars['hit_times'].append(game_vars['current_time'])
-                print(f"普通敌机被击落！进度: {game_vars['normal_enemy_killed']}/{NORMAL_TO_BOSS1}")
-
-        if check_collision(enemy_rect, player_rect, radius2=min(game_vars['enemy_w'], game_vars['enemy_h']) / 2):
-            print("玩家与敌机碰撞！游戏结束")
-            game_vars['game_over'] = True
-
-    # Boss导弹碰撞检测
-    if game_vars['boss_active'] and game_vars['missile_active'] and missile_rect:
-        boss_rect = pygame.Rect(
-            game_vars['boss_x'], game_vars['boss_y'],
-            game_vars['boss_1_w'] if game_vars['current_boss'] == 1 else game_vars['boss_2_w'],
-            game_vars['boss_1_h'] if game_vars['current_boss'] == 1 else game_vars['boss_2_h']
-        )
-        boss_radius = min(game_vars['boss_1_w'], game_vars['boss_1_h']) / 2 if game_vars['current_boss'] == 1 else min(
-            game_vars['boss_2_w'], game_vars['boss_2_h']) / 2
-
-        if check_collision(missile_rect, boss_rect, radius2=boss_radius):
-            damage = random.randint(10, 20)
-            game_vars['boss_health'] -= damage
-            game_vars['score'] += 2
-            print(f"导弹击中Boss{game_vars['current_boss']}！伤害:{damage} 剩余血量:{game_vars['boss_health']} 得分+2")
-            missile_hit = True
-
-    # 子弹碰撞检测
-    if game_vars['missile_active'] and missile_rect and bullet_rect:
-        if check_collision(missile_rect, bullet_rect, radius2=min(game_vars['bullet_w'], game_vars['bullet_h']) / 2):
-            game_vars['score'] += 1
-            game_vars['bullet_active'] = False
-            missile_hit = True
-            game_vars['hit_times'].append(game_vars['current_time'])
-            print(f"击中敌机子弹！当前分数: {int(game_vars['score'])}")
-
-    if missile_hit and game_vars['missile_active']:
-        game_vars['missile_active'] = False
-
-    # 玩家被子弹击中检测
-    if game_vars['bullet_active'] and bullet_rect:
-        if check_collision(bullet_rect, player_rect, radius1=min(game_vars['bullet_w'], game_vars['bullet_h']) / 2):
-            print("玩家被敌机子弹击中！游戏结束")
-            game_vars['game_over'] = True
-
-    # 分数检查
-    if game_vars['score'] < 0:
-        print("分数已耗尽，游戏结束")
-        game_vars['game_over'] = True
-        game_vars['score'] = 0
-
-
-# 渲染游戏画面
-def render_frame(game_vars):
-    screen.blit(bg1, (0, 0))
-    screen.blit(plane, (int(game_vars['plane_x']), int(game_vars['plane_y'])))
-
-    if game_vars['enemy_active']:
-        screen.blit(game_vars['enemy_img'], (game_vars['enemy_x'], game_vars['enemy_y']))
-
-    if game_vars['bullet_active']:
-        screen.blit(game_vars['bullet_img'], (game_vars['bullet_x'], game_vars['bullet_y']))
-
-    if game_vars['missile_active']:
-        screen.blit(game_vars['missile_img'], (int(game_vars['missile_x']), int(game_vars['missile_y'])))
-
-    if game_vars['boss_active']:
-        screen.blit(boss_1_img if game_vars['current_boss'] == 1 else boss_2_img,
-                    (game_vars['boss_x'], game_vars['boss_y']))
-        health_width = int((game_vars['boss_health'] / game_vars['boss_max_health']) *
-                           (200 if game_vars['current_boss'] == 1 else 300))
-        pygame.draw.rect(screen, COLORS["RED"], (game_vars['boss_x'], game_vars['boss_y'] - 10, health_width, 5))
+            face = face_service.position(time.monotonic() + FACE_PREDICTION_LEAD)
+
+    command = InputCommand(
+        left=bool(keys[K_a] or keys[K_LEFT]),
+        right=bool(keys[K_d] or keys[K_RIGHT]),
+        up=bool(keys[K_w] or keys[K_UP]),
+        down=bool(keys[K_s] or keys[K_DOWN]),
+        pointer=viewport.to_world(*pygame.mouse.get_pos()),
+        face=face,
+        fire=fire,
+    )
+    return running, command
+
+
+# 渲染游戏画面，pointer为准星的逻辑坐标，默认取当前鼠标位置
+# alpha为当前时刻在上一个和当前逻辑帧之间的位置（0~1），运动物体按它插值绘制
+# 逻辑坐标按viewport缩放到窗口，精灵、准星和HUD字体使用该缩放比例下预先准备好的版本
+def render_frame(game_vars, pointer=None, alpha=1.0):
+    scale, origin_x, origin_y = viewport.scale, viewport.x, viewport.y
+    images = get_scaled_sprites(scale)
+    hud_fonts = get_scaled_fonts(scale)
+    score_hud.set_font(hud_fonts["medium"])
+    combo_hud.set_font(hud_fonts["small"])
+    control_hud.set_font(hud_fonts["small"])
+    frame_renderer.begin_frame(screen, images["bg1"], viewport.rect)
+    draw = frame_renderer.blit
+    player = game_vars.player
+    draw(screen, images["plane"], (int(origin_x + (player.prev_x + (player.x - player.prev_x) * alpha) * scale),
+                                   int(origin_y + (player.prev_y + (player.y - player.prev_y) * alpha) * scale)))
+
+    enemies = game_vars.wave.enemies
+    if enemies.count:
+        xs, ys = enemies.interpolated(alpha)
+        for i in enemies.indices():
+            draw(screen, images["enemies"][enemies.kind[i]], (origin_x + xs[i] * scale, origin_y + ys[i] * scale))
+
+    # 子弹可能有上千颗，屏幕坐标整体向量计算后一次批量绘制
+    bullets = game_vars.projectiles.bullets
+    if bullets.count:
+        xs, ys = bullets.interpolated(alpha)
+        idx = bullets.indices()
+        frame_renderer.blit_many(screen, images["bullet"], zip((origin_x + xs[idx] * scale).tolist(),
+                                                               (origin_y + ys[idx] * scale).tolist()))
+
+    missiles = game_vars.projectiles.missiles
+    if missiles.count:
+        xs, ys = missiles.interpolated(alpha)
+        for i in missiles.indices():
+            draw(screen, images["missile"], (int(origin_x + xs[i] * scale), int(origin_y + ys[i] * scale)))
+
+    boss = game_vars.boss
+    if boss.active:
+        boss_x, boss_y = viewport.to_screen(boss.x, boss.prev_y + (boss.y - boss.prev_y) * alpha)
+        draw(screen, images["boss_1"] if boss.current == 1 else images["boss_2"], (boss_x, boss_y))
+        health_width = int((boss.health / boss.max_health) * (200 if boss.current == 1 else 300) * scale)
+        frame_renderer.draw_rect(screen, COLORS["RED"],
+                                 (boss_x, boss_y - 10 * scale, max(health_width, 0), max(1, round(5 * scale))))
 
     # 显示连击信息
-    if game_vars['combo_count'] > 0:
-        combo_text = info_font.render(f"连击: {game_vars['combo_count']}", True, (255, 215, 0))
-        screen.blit(combo_text, (10, 50))
+    if game_vars.combo.count > 0:
+        draw(screen, combo_hud.update(game_vars.combo.count), viewport.to_screen(10, 50))
 
     # 显示准星
-    if game_vars['control_type'] == 0:
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        screen.blit(game_vars['crosshair'], (mouse_x - 16, mouse_y - 16))
+    if game_vars.control_type == 0:
+        if pointer is None:
+            pointer = viewport.to_world(*pygame.mouse.get_pos())
+        mouse_x, mouse_y = viewport.to_screen(*pointer)
+        cursor = get_scaled_crosshair(scale)
+        draw(screen, cursor, (mouse_x - cursor.get_width() // 2, mouse_y - cursor.get_height() // 2))
 
     # 显示分数和控制方式
-    score_text = score_font.render(f"分数: {int(game_vars['score'])}", True, COLORS["WHITE"])
-    screen.blit(score_text, (10, 10))
+    draw(screen, score_hud.update(int(game_vars.score)), viewport.to_screen(10, 10))
 
-    control_texts = {
-        0: "鼠标控制",
-        1: "键盘控制",
-        2: "人脸控制"
-    }
-    control_text = info_font.render(control_texts[game_vars['control_type']], True, COLORS["YELLOW"])
-    screen.blit(control_text, (GAME_WIDTH - control_text.get_width() - 10, 10))
+    control_text = control_hud.update(CONTROL_TEXTS[game_vars.control_type])
+    right_x, top_y = viewport.to_screen(GAME_WIDTH - 10, 10)
+    draw(screen, control_text, (right_x - control_text.get_width(), top_y))
 
-    pygame.display.update()
+    # 性能浮层
+    if profiler.overlay:
+        for i, line in enumerate(profiler.overlay_surfaces(hud_fonts["debug"], COLORS["WHITE"])):
+            draw(screen, line, viewport.to_screen(10, GAME_HEIGHT - 130 + i * 18))
+
+    frame_renderer.end_frame(screen)
 
 
 # 处理游戏结束
 def handle_game_over(game_vars):
-    final_score = max(0, game_vars['score'])
-    high_score = load_high_score()
-
-    if final_score < 0:
-        print("游戏结束，最终得分为0")
-
-    return show_game_over(final_score, high_score)
-
-
-# 游戏主循环
-def run_game(control_type):
-    clock, game_vars = init_game_variables(control_type)
+    final_score = max(0, game_vars.score)
+    high_score = max(high_scores.high_score(), int(final_score))
+
+    # 只更新内存中的排行榜，文件在后台线程中写入
+    rank = high_scores.submit(game_vars.control_type, final_score,
+                              duration=round(game_vars.clock.current_time, 2),
+                              normal_killed=game_vars.wave.normal_killed,
+                              boss1_killed=game_vars.wave.boss1_killed,
+                              boss2_killed=game_vars.wave.boss2_killed,
+                              combos=game_vars.combo.count,
+                              best_streak=game_vars.combo.best_streak,
+                              accuracy=round(game_vars.combo.accuracy(), 3),
+                              seed=game_vars.seed)
+
+    return show_game_over(final_score, high_score, rank)
+
+
+# 游戏主循环：按实际经过的时间累积，逻辑以固定步长dt推进，渲染按剩余时间插值，显示帧率不影响玩法
+# replay为录像中的指令列表时按录像驱动，realtime为False时不限帧率，每个显示帧推进一个逻辑帧
+def run_game(control_type, seed=None, replay=None, realtime=True, dt=1 / TICK_RATE, rules=None):
+    clock = pygame.time.Clock()
+    rules = rules if rules is not None else Rules(collision=COLLISION_MODE)
+    game_vars = init_game_variables(control_type, seed=seed, dt=dt, rules=rules, masks=collision_masks)
+    game_vars.events.subscribe(event_log)
+    frame_renderer.invalidate()
+    profiler.reset()
+
+    recorder = None
+    if replay is None and REPLAY_RECORD_DIR is not None:
+        os.makedirs(REPLAY_RECORD_DIR, exist_ok=True)
+        path = os.path.join(REPLAY_RECORD_DIR, time.strftime("session-%Y%m%d-%H%M%S.rpl"))
+        recorder = InputRecorder(path, control_type, game_vars.seed, game_vars.clock.dt, game_vars.rules.collision)
+    replay_commands = iter(replay) if replay is not None else None
 
     running = True
-    while running and not game_vars['game_over']:
-        running = handle_events(game_vars)
-        update_game_state(game_vars)
-        check_collisions(game_vars)
-        render_frame(game_vars)
-        clock.tick(FPS)
-
-    if game_vars['game_over']:
+    replay_done = False
+    accumulator = 0.0
+    # 两个逻辑帧之间按下的开火键保留到下一个逻辑帧，显示帧率高于逻辑帧率时不会丢失
+    pending_fire = False
+    last_time = time.perf_counter()
+    try:
+        while running and not game_vars.game_over:
+            profiler.begin_frame()
+            now = time.perf_counter()
+            if realtime:
+                accumulator += min(now - last_time, MAX_FRAME_TIME)
+            else:
+                accumulator += dt
+            last_time = now
+
+            running, command = handle_events(game_vars)
+            pending_fire = pending_fire or command.fire
+            profiler.mark("handle_events")
+
+            while accumulator >= dt and not game_vars.game_over:
+                accumulator -= dt
+                if replay_commands is not None:
+                    command = next(replay_commands, None)
+                    if command is None:
+                        replay_done = True
+                        break
+                else:
+                    command = command._replace(fire=pending_fire)
+                    pending_fire = False
+                    if recorder is not None:
+                        recorder.record(command)
+                update_game_state(game_vars, command)
+                profiler.mark("update_game_state")
+                check_collisions(game_vars)
+                profiler.mark("check_collisions")
+            if replay_done:
+                break
+
+            render_frame(game_vars, command.pointer, accumulator / dt)
+            profiler.mark("render_frame")
+            clock.tick(FPS if realtime else 0)
+            profiler.mark("clock_tick")
+            profiler.end_frame()
+    finally:
+        # 本局结束即释放摄像头
+        face_service.stop()
+        if recorder is not None:
+            recorder.close()
+
+    if PROFILE_TRACE_FILE is not None:
+        profiler.dump(PROFILE_TRACE_FILE)
+
+    # 回放不写入最高分，也不停在结束画面
+    if replay_commands is not None:
+        return "menu" if running else "quit"
+    if game_vars.game_over:
         return handle_game_over(game_vars)
     return "quit"
 
 
 # 在程序退出时清理资源
 def cleanup():
-    global face_detection_running
-    face_detection_running = False
-    if 'face_thread' in globals() and face_thread.is_alive():
-        face_thread.join()
-    if 'cap' in globals() and cap.isOpened():
-        cap.release()
-    cv2.destroyAllWindows()
+    face_service.stop()
+    high_scores.flush()
+    event_log.close()
     pygame.quit()
\ No newline at end of file
@@ -0,0 +1,131 @@
+from collections import namedtuple
+
+# 游戏事件总线：逻辑核心只发出带类型的事件，由订阅者决定是否输出、记录或统计，
+# 没有订阅者时发出事件只是构造一个小元组
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+LEVELS = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING}
+
+
+class EventBus:
+    __slots__ = ("subscribers",)
+
+    def __init__(self):
+        self.subscribers = []
+
+    def subscribe(self, handler):
+        if handler not in self.subscribers:
+            self.subscribers.append(handler)
+
+    def unsubscribe(self, handler):
+        if handler in self.subscribers:
+            self.subscribers.remove(handler)
+
+    def emit(self, event):
+        for handler in self.subscribers:
+            handler(event)
+
+
+# 各事件类型都带有发生时的逻辑帧号tick，message()只在输出时才调用
+class EnemySpawned(namedtuple("EnemySpawned", ["tick", "remaining"])):
+    __slots__ = ()
+    level = DEBUG
+
+    def message(self):
+        return f"普通敌机生成！还需{self.remaining}架到Boss1"
+
+
+class EnemyKilled(namedtuple("EnemyKilled", ["tick", "normal_killed", "required"])):
+    __slots__ = ()
+    level = INFO
+
+    def message(self):
+        if self.required is None:
+            return "普通敌机被击落！"
+        return f"普通敌机被击落！进度: {self.normal_killed}/{self.required}"
+
+
+class EnemyEscaped(namedtuple("EnemyEscaped", ["tick", "count", "score"])):
+    __slots__ = ()
+    level = WARNING
+
+    def message(self):
+        return f"普通敌机逃脱！当前分数: {self.score}"
+
+
+class BulletDestroyed(namedtuple("BulletDestroyed", ["tick", "score"])):
+    __slots__ = ()
+    level = DEBUG
+
+    def message(self):
+        return f"击中敌机子弹！当前分数: {self.score}"
+
+
+class Combo(namedtuple("Combo", ["tick", "count", "bonus", "score"])):
+    __slots__ = ()
+    level = INFO
+
+    def message(self):
+        return f"连击成功! 得分+{self.bonus} 当前分数: {self.score} (连击数: {self.count})"
+
+
+class BossSpawned(namedtuple("BossSpawned", ["tick", "boss", "boss1_killed", "required"])):
+    __slots__ = ()
+    level = INFO
+
+    def message(self):
+        if self.boss == 1:
+            return f"Boss1生成！进度: {self.boss1_killed}/{self.required}"
+        return "Boss2生成！击落后将提升速度"
+
+
+class BossHit(namedtuple("BossHit", ["tick", "boss", "damage", "health"])):
+    __slots__ = ()
+    level = INFO
+
+    def message(self):
+        return f"导弹击中Boss{self.boss}！伤害:{self.damage} 剩余血量:{self.health} 得分+2"
+
+
+class BossKilled(namedtuple("BossKilled", ["tick", "boss", "boss1_killed", "required", "speed_multiplier"])):
+    __slots__ = ()
+    level = INFO
+
+    def message(self):
+        if self.boss == 1:
+            return f"Boss1被击落！进度: {self.boss1_killed}/{self.required}"
+        return f"Boss2被击落！速度提升至{self.speed_multiplier:.1f}x"
+
+
+class BossEscaped(namedtuple("BossEscaped", ["tick", "boss", "penalty"])):
+    __slots__ = ()
+    level = WARNING
+
+    def message(self):
+        return f"Boss{self.boss}逃跑！分数-{self.penalty}"
+
+
+class FaceControlLost(namedtuple("FaceControlLost", ["tick"])):
+    __slots__ = ()
+    level = WARNING
+
+    def message(self):
+        return "人脸检测已停止且无法重新启动，改为键盘控制"
+
+
+GAME_OVER_REASONS = {
+    "boss_collision": "玩家与Boss碰撞！游戏结束",
+    "enemy_collision": "玩家与敌机碰撞！游戏结束",
+    "bullet_hit": "玩家被敌机子弹击中！游戏结束",
+    "score_depleted": "分数已耗尽，游戏结束",
+}
+
+
+class GameOver(namedtuple("GameOver", ["tick", "reason", "score"])):
+    __slots__ = ()
+    level = WARNING
+
+    def message(self):
+        return GAME_OVER_REASONS.get(self.reason, "游戏结束")
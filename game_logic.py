@@ -0,0 +1,536 @@
+import math
+import random
+from collections import namedtuple
+import numpy as np
+from settings import GAME_WIDTH, GAME_HEIGHT, TICK_RATE, SPRITE_SIZES
+from entity_pool import EntityPool, BulletPool
+from game_events import (EnemySpawned, EnemyKilled, EnemyEscaped, BulletDestroyed, Combo, BossSpawned, BossHit,
+                         BossKilled, BossEscaped, GameOver)
+from game_state import (GameState, PlayerState, WaveState, BossState, ProjectileState, ClockState,
+                        Rules)
+from combo import ComboTracker
+from waves import EnemyPhase, BossPhase, load_script
+from bullet_patterns import pattern_angles
+from collision import (pool_circles, rect_circle, circle_pairs, any_circle_hit, circle_hits, inner_radius,
+                       bounding_radius, rects_overlap, masks_overlap)
+
+# 纯逻辑模拟核心：不依赖窗口、摄像头和字体，按固定步长dt推进，可远快于实时运行
+# 速度以像素/秒、计时以秒为单位，逻辑帧率改变时玩法不变
+
+ENEMY_KINDS = 5
+
+# 实体池容量
+ENEMY_CAPACITY = 256
+BULLET_CAPACITY = 2048
+MISSILE_CAPACITY = 64
+
+# Boss尺寸（宽, 高），与渲染使用的精灵尺寸一致
+BOSS_SIZES = {1: SPRITE_SIZES["boss_1"], 2: SPRITE_SIZES["boss_2"]}
+
+# 每个逻辑帧的输入指令
+# left/right/up/down: 键盘方向; pointer: 鼠标坐标或None; face: 人脸映射后的游戏坐标或None; fire: 是否发射导弹
+InputCommand = namedtuple("InputCommand", ["left", "right", "up", "down", "pointer", "face", "fire"],
+                          defaults=(False, False, False, False, None, None, False))
+IDLE_COMMAND = InputCommand()
+
+
+# 初始化游戏变量
+# masks为像素碰撞用的精灵遮罩，规则要求像素碰撞而未传入时由asset_cache只加载遮罩（只有这时才会导入pygame）
+def init_game_variables(control_type, seed=None, dt=1 / TICK_RATE, rules=None, script=None, masks=None):
+    # 没有指定种子时也生成一个并记录下来，便于录像回放
+    if seed is None:
+        seed = random.randrange(2 ** 63)
+    rules = rules if rules is not None else Rules()
+    if rules.collision == "mask":
+        if masks is None:
+            from asset_cache import load_collision_masks
+            masks = load_collision_masks()
+    elif rules.collision == "circle":
+        masks = None
+    else:
+        raise ValueError(f"未知的碰撞检测方式: {rules.collision}")
+
+    player = PlayerState()
+    player.w, player.h = SPRITE_SIZES["plane"]
+    player.x = player.prev_x = float((GAME_WIDTH - player.w) / 2)
+    player.y = player.prev_y = float(GAME_HEIGHT - player.h - 20)
+
+    game_vars = GameState(
+        control_type=control_type,
+        seed=seed,
+        rng=random.Random(seed),
+        player=player,
+        wave=WaveState(enemies=EntityPool(ENEMY_CAPACITY, *SPRITE_SIZES["enemies"])),
+        boss=BossState(),
+        projectiles=ProjectileState(bullets=BulletPool(BULLET_CAPACITY, *SPRITE_SIZES["bullet"]),
+                                    missiles=EntityPool(MISSILE_CAPACITY, *SPRITE_SIZES["missile"])),
+        combo=ComboTracker(),
+        clock=ClockState(dt=dt),
+        rules=rules,
+        script=script if script is not None else load_script(rules=rules),
+        masks=masks,
+    )
+    enter_phase(game_vars, 0)
+    return game_vars
+
+
+# 发射导弹
+def fire_missile(game_vars):
+    player = game_vars.player
+    projectiles = game_vars.projectiles
+    missiles = projectiles.missiles
+    if missiles.count < projectiles.max_missiles:
+        missiles.spawn(player.x + (player.w - missiles.w) / 2,
+                       player.y - missiles.h,
+                       vy=-projectiles.missile_speed,
+                       spawn_time=game_vars.clock.current_time)
+        game_vars.combo.record_shot()
+
+
+# 更新游戏状态
+def update_game_state(game_vars, command):
+    clock = game_vars.clock
+    clock.tick += 1
+    clock.current_time = clock.tick * clock.dt
+
+    # 记录上一帧位置，供渲染插值
+    player = game_vars.player
+    player.prev_x, player.prev_y = player.x, player.y
+    game_vars.boss.prev_y = game_vars.boss.y
+
+    if command.fire:
+        fire_missile(game_vars)
+
+    update_combo_system(game_vars)
+    update_player_position(game_vars, command)
+    advance_wave_script(game_vars)
+    update_enemies_and_bullets(game_vars)
+    update_boss_logic(game_vars)
+
+    missiles = game_vars.projectiles.missiles
+    if missiles.count:
+        missiles.integrate(game_vars.speed_multiplier * clock.dt)
+        missiles.cull_outside(0, 0, GAME_WIDTH, GAME_HEIGHT)
+
+
+# 更新连击系统
+def update_combo_system(game_vars):
+    combo = game_vars.combo
+    current_time = game_vars.clock.current_time
+    combo.expire(current_time)
+
+    interval = combo.last_interval()
+    if interval is not None and interval <= combo.window:
+        if current_time - combo.last_score_time > combo.window:
+            bonus = combo.tier_bonus()
+            game_vars.score += bonus
+            combo.count += 1
+            combo.last_score_time = current_time
+            game_vars.events.emit(Combo(game_vars.clock.tick, combo.count, bonus, int(game_vars.score)))
+
+
+# 更新玩家位置
+def update_player_position(game_vars, command):
+    player = game_vars.player
+    control_type = game_vars.control_type
+
+    if control_type == 0:  # 鼠标控制
+        if command.pointer is None:
+            return
+        mouse_x, mouse_y = command.pointer
+        target_x = mouse_x - player.w / 2
+        target_y = mouse_y - player.h / 2
+        player.x = max(0, min(target_x, GAME_WIDTH - player.w))
+        player.y = max(0, min(target_y, GAME_HEIGHT - player.h))
+
+    elif control_type == 1:  # 键盘控制
+        moving_left = command.left
+        moving_right = command.right
+        moving_up = command.up
+        moving_down = command.down
+
+        dt = game_vars.clock.dt
+        speed_multiplier = game_vars.speed_multiplier
+        current_max_speed = player.max_speed * speed_multiplier
+        current_acceleration = player.acceleration * speed_multiplier * dt
+        current_deceleration = player.deceleration * speed_multiplier * dt
+
+        if moving_left and not moving_right:
+            player.move_speed = max(player.move_speed - current_acceleration, -current_max_speed)
+        elif moving_right and not moving_left:
+            player.move_speed = min(player.move_speed + current_acceleration, current_max_speed)
+        else:
+            if player.move_speed > 0:
+                player.move_speed = max(player.move_speed - current_deceleration, 0)
+            elif player.move_speed < 0:
+                player.move_speed = min(player.move_speed + current_deceleration, 0)
+
+        player.x += player.move_speed * dt
+        player.x = max(0, min(player.x, GAME_WIDTH - player.w))
+
+        if moving_up and not moving_down:
+            player.y = max(player.y - current_max_speed * 0.7 * dt, 0)
+        elif moving_down and not moving_up:
+            player.y = min(player.y + current_max_speed * 0.7 * dt, GAME_HEIGHT - player.h)
+
+    elif control_type == 2:  # 人脸控制
+        if command.face is not None:
+            face_x, face_y = command.face
+
+            # 将飞机的中心点对准人脸中心点
+            target_x = face_x - player.w / 2
+            target_y = face_y - player.h / 2
+            target_x = max(0, min(target_x, GAME_WIDTH - player.w))
+            target_y = max(0, min(target_y, GAME_HEIGHT - player.h))
+
+            # 移动到目标位置，输入端已做过滤波，face_smoothing大于0时再按时间常数额外平滑
+            follow = 1.0
+            if player.face_smoothing > 0:
+                follow = 1.0 - math.exp(-game_vars.clock.dt / player.face_smoothing)
+            player.x += (target_x - player.x) * follow
+            player.y += (target_y - player.y) * follow
+            player.x = max(0, min(player.x, GAME_WIDTH - player.w))
+            player.y = max(0, min(player.y, GAME_HEIGHT - player.h))
+
+
+# 进入波次脚本的第index个阶段，回到第一个阶段时开始新的一轮
+def enter_phase(game_vars, index):
+    wave = game_vars.wave
+    if index == 0:
+        wave.boss1_killed = 0
+    wave.phase = index
+    wave.phase_start = game_vars.clock.current_time
+    wave.spawn_cursor = 0
+    wave.normal_killed = 0
+
+    phase = game_vars.script.phases[index]
+    if isinstance(phase, EnemyPhase):
+        wave.speed = phase.speed
+        wave.max_enemies = phase.max_alive
+        wave.fire = phase.fire
+        if phase.fire is not None:
+            projectiles = game_vars.projectiles
+            projectiles.bullet_speed = phase.fire.speed
+            projectiles.bullet_cooldown = phase.fire.cooldown
+            projectiles.max_bullets = phase.fire.max_bullets
+
+
+# 生成Boss
+def spawn_boss(boss, phase, current_time):
+    boss.current = phase.boss
+    boss.active = True
+    boss.w, boss.h = BOSS_SIZES[phase.boss]
+    boss.x = (GAME_WIDTH - boss.w) // 2
+    boss.y = boss.prev_y = -boss.h
+    boss.speed = phase.speed
+    boss.health = phase.health
+    boss.max_health = phase.health
+    boss.stage = 0
+    fire = phase.stages[0].fire
+    boss.next_fire = current_time + (fire.cooldown if fire is not None else 0.0)
+
+
+# 生成一架普通敌机，x和kind为None时随机
+def spawn_enemy(game_vars, x=None, kind=None):
+    wave = game_vars.wave
+    enemies = wave.enemies
+    rng = game_vars.rng
+    current_time = game_vars.clock.current_time
+    if x is None:
+        x = rng.randint(0, GAME_WIDTH - enemies.w)
+    if kind is None:
+        kind = rng.randint(0, ENEMY_KINDS - 1)
+    next_fire = math.inf if wave.fire is None else current_time + rng.uniform(*wave.fire.delay)
+    enemies.spawn(x, -enemies.h, vy=wave.speed, kind=kind, spawn_time=current_time, next_fire=next_fire)
+
+
+# 按波次脚本推进：敌机阶段达到击落数（或定时生成全部结束且场上清空）后进入下一阶段，
+# Boss阶段在场上敌机清空后生成Boss；定时生成只比较游标处的时间
+def advance_wave_script(game_vars):
+    boss = game_vars.boss
+    if boss.active:
+        return
+
+    wave = game_vars.wave
+    enemies = wave.enemies
+    phases = game_vars.script.phases
+    phase = phases[wave.phase]
+
+    if isinstance(phase, EnemyPhase):
+        spawns = phase.spawns
+        if ((phase.kills is not None and wave.normal_killed >= phase.kills) or
+                (spawns is not None and wave.spawn_cursor == len(spawns) and enemies.count == 0)):
+            enter_phase(game_vars, (wave.phase + 1) % len(phases))
+            phase = phases[wave.phase]
+
+    if isinstance(phase, BossPhase):
+        if enemies.count == 0:
+            spawn_boss(boss, phase, game_vars.clock.current_time)
+            game_vars.events.emit(BossSpawned(game_vars.clock.tick, phase.boss, wave.boss1_killed,
+                                              game_vars.script.boss1_required))
+        return
+
+    spawns = phase.spawns
+    if spawns is None:
+        if enemies.count < wave.max_enemies:
+            spawn_enemy(game_vars)
+            game_vars.events.emit(EnemySpawned(game_vars.clock.tick, phase.kills - wave.normal_killed))
+    else:
+        elapsed = game_vars.clock.current_time - wave.phase_start
+        while wave.spawn_cursor < len(spawns) and spawns[wave.spawn_cursor].time <= elapsed:
+            entry = spawns[wave.spawn_cursor]
+            spawn_enemy(game_vars, entry.x, entry.kind)
+            wave.spawn_cursor += 1
+            remaining = (phase.kills - wave.normal_killed if phase.kills is not None
+                         else len(spawns) - wave.spawn_cursor)
+            game_vars.events.emit(EnemySpawned(game_vars.clock.tick, remaining))
+
+
+# 按弹幕从(x, y)处以speed发射一组子弹，场上子弹总数不超过limit；自机狙瞄准玩家中心
+def fire_pattern(game_vars, fire, x, y, speed, limit):
+    bullets = game_vars.projectiles.bullets
+    room = limit - bullets.count
+    if room <= 0:
+        return
+    player = game_vars.player
+    current_time = game_vars.clock.current_time
+    angles = pattern_angles(fire, x, y, (player.x + player.w / 2, player.y + player.h / 2), current_time)
+    bullets.emit(x - bullets.w / 2, y, angles[:room], speed, math.radians(fire.turn), current_time)
+
+
+# 更新敌机和子弹位置
+def update_enemies_and_bullets(game_vars):
+    enemies = game_vars.wave.enemies
+    projectiles = game_vars.projectiles
+    bullets = projectiles.bullets
+    scale = game_vars.speed_multiplier * game_vars.clock.dt
+
+    if enemies.count:
+        enemies.integrate(scale)
+
+    if bullets.count:
+        bullets.advance(game_vars.clock.current_time, game_vars.speed_multiplier)
+        bullets.cull_outside(0, 0, GAME_WIDTH, GAME_HEIGHT)
+
+    # 共用的发射冷却结束后，已过生成后开火延迟的敌机各按概率发射子弹，有敌机开火后重新冷却；
+    # 本帧刚飞出画面的敌机也参与判断，之后才移除
+    fire = game_vars.wave.fire
+    current_time = game_vars.clock.current_time
+    if (fire is not None and enemies.count and bullets.count < projectiles.max_bullets and
+            current_time - projectiles.last_bullet_time >= projectiles.bullet_cooldown):
+        ready = np.flatnonzero(enemies.alive & (enemies.next_fire <= current_time))
+        rng = game_vars.rng
+        for i in ready:
+            if bullets.count >= projectiles.max_bullets:
+                break
+            if rng.random() < fire.chance:
+                fire_pattern(game_vars, fire, enemies.x[i] + enemies.w / 2, enemies.y[i] + enemies.h,
+                             projectiles.bullet_speed, projectiles.max_bullets)
+                projectiles.last_bullet_time = current_time
+
+    if enemies.count:
+        escaped = enemies.cull_outside(0, 0, GAME_WIDTH, GAME_HEIGHT)
+        if escaped:
+            game_vars.score -= escaped
+            game_vars.events.emit(EnemyEscaped(game_vars.clock.tick, escaped, int(game_vars.score)))
+
+
+# 更新Boss逻辑
+def update_boss_logic(game_vars):
+    boss = game_vars.boss
+    if not boss.active:
+        return
+
+    wave = game_vars.wave
+    phase = game_vars.script.phases[wave.phase]
+    bullets = game_vars.projectiles.bullets
+    current_time = game_vars.clock.current_time
+    boss.y += boss.speed * game_vars.speed_multiplier * game_vars.clock.dt
+
+    if boss.y > 100:
+        boss.y = 100
+        boss.escape_timer += game_vars.clock.dt
+
+        if boss.escape_timer > phase.escape_time:
+            boss.active = False
+            boss.escape_timer = 0
+            boss.current = None
+            bullets.clear()
+
+            game_vars.score -= phase.escape_penalty
+            game_vars.events.emit(BossEscaped(game_vars.clock.tick, phase.boss, phase.escape_penalty))
+            enter_phase(game_vars, phase.on_escape)
+            return
+
+    # 血量降到阈值以下时切换形态
+    stages = phase.stages
+    while boss.stage + 1 < len(stages) and boss.health <= stages[boss.stage + 1].health * boss.max_health:
+        boss.stage += 1
+    fire = stages[boss.stage].fire
+    if fire is not None and current_time >= boss.next_fire:
+        fire_pattern(game_vars, fire, boss.x + boss.w / 2, boss.y + boss.h, fire.speed, fire.max_bullets)
+        boss.next_fire = current_time + fire.cooldown
+
+    if boss.health <= 0:
+        if phase.boss == 1:
+            wave.boss1_killed += 1
+        else:
+            wave.boss2_killed += 1
+        game_vars.speed_multiplier *= phase.speed_up
+        game_vars.events.emit(BossKilled(game_vars.clock.tick, phase.boss, wave.boss1_killed,
+                                         game_vars.script.boss1_required, game_vars.speed_multiplier))
+
+        boss.active = False
+        boss.current = None
+        boss.escape_timer = 0
+        bullets.clear()
+        enter_phase(game_vars, phase.on_kill)
+
+
+# 碰撞检测：所有导弹与敌机、Boss、子弹，以及所有敌方单位与玩家，均按圆形批量检测；
+# 像素模式下圆形改为外接圆（Boss与玩家用包围盒）做粗筛，只对通过粗筛的候选对比较精灵遮罩
+def check_collisions(game_vars):
+    wave = game_vars.wave
+    boss = game_vars.boss
+    player = game_vars.player
+    enemies = wave.enemies
+    bullets = game_vars.projectiles.bullets
+    missiles = game_vars.projectiles.missiles
+    combo = game_vars.combo
+    current_time = game_vars.clock.current_time
+    tick = game_vars.clock.tick
+    events = game_vars.events
+    masks = game_vars.masks
+    radius = inner_radius if masks is None else bounding_radius
+
+    player_x = player.x + player.w / 2
+    player_y = player.y + player.h / 2
+    player_r = radius(player.w, player.h)
+
+    if boss.active:
+        boss_x, boss_y, boss_r = rect_circle(boss.x, boss.y, boss.w, boss.h, radius(boss.w, boss.h))
+        boss_mask = None if masks is None else masks["boss_1" if boss.current == 1 else "boss_2"]
+
+        # Boss碰撞检测
+        if masks is None:
+            boss_hit = any_circle_hit(boss_x, boss_y, boss_r, player_x, player_y, player_r)
+        else:
+            boss_hit = (rects_overlap(boss.x, boss.y, boss.w, boss.h, player.x, player.y, player.w, player.h) and
+                        masks_overlap(masks["plane"], player.x, player.y, boss_mask, boss.x, boss.y))
+        if boss_hit:
+            game_vars.game_over = True
+            events.emit(GameOver(tick, "boss_collision", int(game_vars.score)))
+
+    # 一枚导弹在同一帧内可分别击中一架敌机、Boss和一颗子弹，全部检测完后才移除
+    if missiles.count:
+        m_idx, m_x, m_y, m_r = pool_circles(missiles, radius(missiles.w, missiles.h))
+        hit_enemy, hit_boss, hit_bullet = set(), set(), set()
+
+        # 普通敌机被导弹击中
+        if enemies.count:
+            phase = game_vars.script.phases[wave.phase]
+            required_kills = phase.kills if isinstance(phase, EnemyPhase) else None
+            e_idx, e_x, e_y, e_r = pool_circles(enemies, radius(enemies.w, enemies.h))
+            for mi, ei in zip(*circle_pairs(m_x, m_y, m_r, e_x, e_y, e_r)):
+                m, e = m_idx[mi], e_idx[ei]
+                if m not in hit_enemy and enemies.alive[e] and (
+                        masks is None or masks_overlap(masks["missile"], missiles.x[m], missiles.y[m],
+                                                       masks["enemies"][enemies.kind[e]], enemies.x[e], enemies.y[e])):
+                    game_vars.score += 2
+                    wave.normal_killed += 1
+                    enemies.kill(e)
+                    hit_enemy.add(m)
+                    combo.record_hit(current_time)
+                    events.emit(EnemyKilled(tick, wave.normal_killed, required_kills))
+
+        # Boss被导弹击中
+        if boss.active:
+            for mi, _ in zip(*circle_pairs(m_x, m_y, m_r, boss_x, boss_y, boss_r)):
+                m = m_idx[mi]
+                if m not in hit_boss and (
+                        masks is None or masks_overlap(masks["missile"], missiles.x[m], missiles.y[m],
+                                                       boss_mask, boss.x, boss.y)):
+                    damage = game_vars.rng.randint(game_vars.rules.damage_min, game_vars.rules.damage_max)
+                    boss.health -= damage
+                    game_vars.score += 2
+                    hit_boss.add(m)
+                    events.emit(BossHit(tick, boss.current, damage, boss.health))
+
+        # 敌机子弹被导弹击中
+        if bullets.count:
+            b_idx, b_x, b_y, b_r = pool_circles(bullets, radius(bullets.w, bullets.h))
+            for mi, bi in zip(*circle_pairs(m_x, m_y, m_r, b_x, b_y, b_r)):
+                m, b = m_idx[mi], b_idx[bi]
+                if m not in hit_bullet and bullets.alive[b] and (
+                        masks is None or masks_overlap(masks["missile"], missiles.x[m], missiles.y[m],
+                                                       masks["bullet"], bullets.x[b], bullets.y[b])):
+                    game_vars.score += 1
+                    bullets.kill(b)
+                    hit_bullet.add(m)
+                    combo.record_hit(current_time)
+                    events.emit(BulletDestroyed(tick, int(game_vars.score)))
+
+        for m in sorted(hit_enemy | hit_boss | hit_bullet):
+            missiles.kill(m)
+
+    # 玩家与敌机碰撞检测
+    if enemies.count:
+        e_idx, e_x, e_y, e_r = pool_circles(enemies, radius(enemies.w, enemies.h))
+        if masks is None:
+            enemy_hit = any_circle_hit(e_x, e_y, e_r, player_x, player_y, player_r)
+        else:
+            enemy_hit = any(masks_overlap(masks["plane"], player.x, player.y,
+                                          masks["enemies"][enemies.kind[e]], enemies.x[e], enemies.y[e])
+                            for e in e_idx[circle_hits(e_x, e_y, e_r, player_x, player_y, player_r)])
+        if enemy_hit:
+            game_vars.game_over = True
+            events.emit(GameOver(tick, "enemy_collision", int(game_vars.score)))
+
+    # 玩家被子弹击中检测
+    if bullets.count:
+        b_idx, b_x, b_y, b_r = pool_circles(bullets, radius(bullets.w, bullets.h))
+        if masks is None:
+            bullet_hit = any_circle_hit(b_x, b_y, b_r, player_x, player_y, player_r)
+        else:
+            bullet_hit = any(masks_overlap(masks["plane"], player.x, player.y,
+                                           masks["bullet"], bullets.x[b], bullets.y[b])
+                             for b in b_idx[circle_hits(b_x, b_y, b_r, player_x, player_y, player_r)])
+        if bullet_hit:
+            game_vars.game_over = True
+            events.emit(GameOver(tick, "bullet_hit", int(game_vars.score)))
+
+    # 分数检查
+    if game_vars.score < 0:
+        game_vars.game_over = True
+        game_vars.score = 0
+        events.emit(GameOver(tick, "score_depleted", 0))
+
+
+# 推进一个逻辑帧
+def step_game(game_vars, command):
+    update_game_state(game_vars, command)
+    check_collisions(game_vars)
+    return not game_vars.game_over
+
+
+# 无窗口批量模拟：commands可以是指令序列，也可以是接收game_vars返回指令的函数；events为事件订阅者
+def run_headless(commands, control_type=1, seed=None, dt=1 / TICK_RATE, max_ticks=None, rules=None, events=None,
+                 script=None):
+    game_vars = init_game_variables(control_type, seed=seed, dt=dt, rules=rules, script=script)
+    if events is not None:
+        game_vars.events.subscribe(events)
+
+    if callable(commands):
+        policy = commands
+    else:
+        command_iter = iter(commands)
+
+        def policy(_):
+            return next(command_iter, IDLE_COMMAND)
+
+    while not game_vars.game_over:
+        if max_ticks is not None and game_vars.clock.tick >= max_ticks:
+            break
+        step_game(game_vars, policy(game_vars))
+
+    return game_vars
@@ -1,20 +1,138 @@
 import os
 import json
+import time
+import tempfile
+from threading import Thread, Condition
+from settings import LEADERBOARD_SIZE
 
 HIGH_SCORE_FILE = "high_score.json"
+FILE_VERSION = 2
 
-def load_high_score():
-    if os.path.exists(HIGH_SCORE_FILE):
+
+# 最高分和排行榜：创建时由后台线程读入内存（与资源加载同时进行），主线程只读缓存；
+# 写入也在该线程中完成，先写临时文件并fsync，再用os.replace替换，进程中途退出也不会留下损坏的文件
+class HighScoreStore:
+    def __init__(self, path=HIGH_SCORE_FILE, size=LEADERBOARD_SIZE):
+        self.path = path
+        self.size = size
+        # 控制方式 -> 按分数从高到低排列的记录列表；文件读完之前为空，查询返回默认值0
+        self.leaderboards = {}
+        # 旧格式文件{"high_score": N}中的分数，没有控制方式等信息，只参与最高分
+        self.legacy_high_score = 0
+        self.loaded = False
+
+        self._cond = Condition()
+        self._dirty = False
+        self._writing = False
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _read(self):
         try:
-            with open(HIGH_SCORE_FILE, "r") as f:
-                return json.load(f).get("high_score", 0)
-        except (json.JSONDecodeError, IOError):
-            return 0
-    return 0
-
-def save_high_score(score):
-    try:
-        with open(HIGH_SCORE_FILE, "w") as f:
-            json.dump({"high_score": int(score)}, f)
-    except (IOError, TypeError):
-        pass
\ No newline at end of file
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0, {}
+        if not isinstance(data, dict):
+            return 0, {}
+        if data.get("version") == FILE_VERSION:
+            return (data.get("legacy_high_score", 0),
+                    {int(key): entries for key, entries in data.get("leaderboards", {}).items()})
+        return data.get("high_score", 0), {}
+
+    # 读入文件后与读完之前提交的成绩合并，再开始处理写入
+    def _run(self):
+        legacy_high_score, leaderboards = self._read()
+        with self._cond:
+            for control_type, entries in self.leaderboards.items():
+                merged = leaderboards.setdefault(control_type, [])
+                merged.extend(entries)
+                merged.sort(key=lambda entry: -entry["score"])
+                del merged[self.size:]
+            self.leaderboards = leaderboards
+            self.legacy_high_score = legacy_high_score
+            self.loaded = True
+        self._writer()
+
+    # 最高分，control_type为None时取所有控制方式中的最高分
+    def high_score(self, control_type=None):
+        if control_type is not None:
+            entries = self.leaderboards.get(control_type)
+            return entries[0]["score"] if entries else 0
+        best = self.legacy_high_score
+        for entries in self.leaderboards.values():
+            if entries:
+                best = max(best, entries[0]["score"])
+        return best
+
+    def leaderboard(self, control_type):
+        return list(self.leaderboards.get(control_type, ()))
+
+    # 提交一局成绩，metadata为本局的附加信息；进入排行榜时返回名次（从1开始），否则返回None
+    # 文件尚未读完时名次只相对已提交的成绩，读完后再合并
+    def submit(self, control_type, score, **metadata):
+        entry = {"score": int(score), "date": time.strftime("%Y-%m-%d %H:%M:%S"), **metadata}
+        with self._cond:
+            entries = self.leaderboards.setdefault(control_type, [])
+            rank = 0
+            while rank < len(entries) and entries[rank]["score"] >= entry["score"]:
+                rank += 1
+            if rank >= self.size:
+                return None
+            entries.insert(rank, entry)
+            del entries[self.size:]
+            self._dirty = True
+            self._cond.notify()
+        return rank + 1
+
+    def _writer(self):
+        while True:
+            with self._cond:
+                while not self._dirty:
+                    self._cond.wait()
+                self._dirty = False
+                self._writing = True
+                data = {
+                    "version": FILE_VERSION,
+                    "high_score": self.high_score(),
+                    "legacy_high_score": self.legacy_high_score,
+                    "leaderboards": {str(key): [dict(entry) for entry in entries]
+                                     for key, entries in self.leaderboards.items()},
+                }
+            try:
+                self._write(data)
+            except OSError as e:
+                print(f"最高分保存失败: {e}")
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+    def _write(self, data):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(prefix=".high_score-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    # 等待尚未完成的写入，退出前调用
+    def flush(self, timeout=2.0):
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while self._dirty or self._writing:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+
+high_scores = HighScoreStore()
@@ -0,0 +1,116 @@
+import csv
+import json
+import time
+import numpy as np
+
+STAGES = ("handle_events", "update_game_state", "check_collisions", "render_frame", "clock_tick")
+PERCENTILES = (50, 95, 99)
+# 滚动统计的帧数
+WINDOW = 600
+# 帧耗时超过预算的该倍数时记为掉帧（错过了一次刷新）
+DROP_FACTOR = 1.5
+# 浮层文字每隔多少帧刷新一次
+OVERLAY_REFRESH = 30
+
+
+# 逐帧分阶段计时：滚动窗口内的p50/p95/p99、掉帧计数、可开关的浮层，以及CSV/Chrome trace导出
+class FrameProfiler:
+    def __init__(self, budget, window=WINDOW, record=False):
+        self.budget = budget
+        self.window = window
+        self.record = record
+        self.overlay = False
+
+        # 每行为一帧：各阶段耗时和整帧耗时（秒）
+        self.samples = np.zeros((window, len(STAGES) + 1))
+        self.frames = 0
+        self.dropped = 0
+        self.trace = []
+
+        self._stage_index = {name: i for i, name in enumerate(STAGES)}
+        self._row = np.zeros(len(STAGES) + 1)
+        self._frame_start = 0.0
+        self._last_mark = 0.0
+        self._session_start = time.perf_counter()
+        self._overlay_lines = []
+        self._overlay_font = None
+
+    def reset(self):
+        self.samples[:] = 0.0
+        self.frames = 0
+        self.dropped = 0
+        self.trace = []
+        self._session_start = time.perf_counter()
+        self._overlay_lines = []
+
+    def begin_frame(self):
+        self._row[:] = 0.0
+        self._frame_start = self._last_mark = time.perf_counter()
+
+    # 记录从上一个标记到现在的耗时，归入指定阶段
+    def mark(self, stage):
+        now = time.perf_counter()
+        self._row[self._stage_index[stage]] += now - self._last_mark
+        self._last_mark = now
+
+    def end_frame(self):
+        total = self._last_mark - self._frame_start
+        self._row[-1] = total
+        self.samples[self.frames % self.window] = self._row
+        self.frames += 1
+        if total > self.budget * DROP_FACTOR:
+            self.dropped += 1
+        if self.record:
+            self.trace.append((self._frame_start - self._session_start, *self._row))
+
+    # 滚动窗口内各阶段及整帧耗时的百分位数（毫秒），返回{名称: (p50, p95, p99)}
+    def percentiles(self):
+        n = min(self.frames, self.window)
+        if n == 0:
+            return {}
+        values = np.percentile(self.samples[:n], PERCENTILES, axis=0) * 1000
+        names = STAGES + ("frame",)
+        return {name: tuple(values[:, i]) for i, name in enumerate(names)}
+
+    def summary_lines(self):
+        lines = [f"frames {self.frames}  dropped {self.dropped}"]
+        for name, (p50, p95, p99) in self.percentiles().items():
+            lines.append(f"{name:<18}{p50:6.2f}{p95:7.2f}{p99:7.2f} ms")
+        return lines
+
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+        self._overlay_lines = []
+
+    # 生成浮层文字表面，数值每OVERLAY_REFRESH帧才重新计算和渲染一次，换了字体（窗口缩放）时立即重新渲染
+    def overlay_surfaces(self, font, color):
+        if not self._overlay_lines or self.frames % OVERLAY_REFRESH == 0 or font is not self._overlay_font:
+            self._overlay_font = font
+            self._overlay_lines = [font.render(line, True, color) for line in self.summary_lines()]
+        return self._overlay_lines
+
+    # 导出逐帧数据，.json为Chrome trace格式（可在chrome://tracing或Perfetto中打开），其余为CSV
+    def dump(self, path):
+        if path.endswith(".json"):
+            self.dump_chrome_trace(path)
+        else:
+            self.dump_csv(path)
+
+    def dump_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("frame", "start_ms") + tuple(f"{name}_ms" for name in STAGES) + ("frame_ms",))
+            for i, row in enumerate(self.trace):
+                writer.writerow([i] + [f"{value * 1000:.4f}" for value in row])
+
+    def dump_chrome_trace(self, path):
+        events = []
+        for i, (start, *durations) in enumerate(self.trace):
+            ts = start * 1e6
+            events.append({"name": "frame", "ph": "X", "ts": ts, "dur": durations[-1] * 1e6,
+                           "pid": 0, "tid": 0, "args": {"frame": i}})
+            for name, duration in zip(STAGES, durations):
+                events.append({"name": name, "ph": "X", "ts": ts, "dur": duration * 1e6, "pid": 0, "tid": 1})
+                ts += duration * 1e6
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
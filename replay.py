@@ -0,0 +1,133 @@
+import argparse
+import os
+import struct
+import time
+from game_logic import InputCommand, run_headless
+from game_state import COLLISION_MODES, Rules
+
+# 录像文件格式（小端）：
+#   文件头：魔数、版本、控制方式、碰撞检测方式、随机种子、逻辑帧时长dt
+#   之后每个逻辑帧一条记录：标志字节，按标志附带鼠标坐标(int16×2)和人脸坐标(float64×2)
+MAGIC = b"ZNLD"
+# 游戏逻辑的行为改变后递增，旧录像无法再准确回放
+VERSION = 4
+HEADER = struct.Struct("<4sBBBqd")
+FLAGS = struct.Struct("<B")
+POINTER = struct.Struct("<hh")
+FACE = struct.Struct("<dd")
+
+LEFT, RIGHT, UP, DOWN, FIRE, HAS_POINTER, HAS_FACE = (1 << i for i in range(7))
+
+
+def encode_command(command):
+    flags = ((LEFT if command.left else 0) | (RIGHT if command.right else 0) |
+             (UP if command.up else 0) | (DOWN if command.down else 0) |
+             (FIRE if command.fire else 0) |
+             (HAS_POINTER if command.pointer is not None else 0) |
+             (HAS_FACE if command.face is not None else 0))
+    data = FLAGS.pack(flags)
+    if command.pointer is not None:
+        data += POINTER.pack(*command.pointer)
+    if command.face is not None:
+        data += FACE.pack(*command.face)
+    return data
+
+
+def decode_commands(data, offset):
+    commands = []
+    while offset < len(data):
+        flags, = FLAGS.unpack_from(data, offset)
+        offset += FLAGS.size
+        pointer = face = None
+        if flags & HAS_POINTER:
+            pointer = POINTER.unpack_from(data, offset)
+            offset += POINTER.size
+        if flags & HAS_FACE:
+            face = FACE.unpack_from(data, offset)
+            offset += FACE.size
+        commands.append(InputCommand(bool(flags & LEFT), bool(flags & RIGHT), bool(flags & UP), bool(flags & DOWN),
+                                     pointer, face, bool(flags & FIRE)))
+    return commands
+
+
+# 录制一局的随机种子和逐帧输入，局结束时一次写入文件
+class InputRecorder:
+    def __init__(self, path, control_type, seed, dt, collision):
+        self.path = path
+        self.buffer = bytearray(HEADER.pack(MAGIC, VERSION, control_type, COLLISION_MODES.index(collision), seed, dt))
+        self.ticks = 0
+
+    def record(self, command):
+        self.buffer += encode_command(command)
+        self.ticks += 1
+
+    # 以独占方式创建文件，同名文件已存在（如同一秒内结束的两局）时依次加-1、-2后缀，不覆盖旧录像
+    def close(self):
+        base, ext = os.path.splitext(self.path)
+        suffix = 0
+        while True:
+            try:
+                with open(self.path, "xb") as f:
+                    f.write(self.buffer)
+                return
+            except FileExistsError:
+                suffix += 1
+                self.path = f"{base}-{suffix}{ext}"
+
+
+# 读取录像，返回(控制方式, 随机种子, dt, 录制时的规则, 指令列表)
+def load_replay(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, control_type, collision, seed, dt = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"不是有效的录像文件: {path}")
+    return control_type, seed, dt, Rules(collision=COLLISION_MODES[collision]), decode_commands(data, HEADER.size)
+
+
+# 无窗口回放，不限速度
+def replay_headless(path):
+    control_type, seed, dt, rules, commands = load_replay(path)
+    return run_headless(commands, control_type=control_type, seed=seed, dt=dt, max_ticks=len(commands), rules=rules)
+
+
+# 带画面回放，realtime为False时不限帧率
+def replay_rendered(path, realtime=False):
+    import functions_all
+
+    control_type, seed, dt, rules, commands = load_replay(path)
+    try:
+        return functions_all.run_game(control_type, seed=seed, replay=commands, realtime=realtime, dt=dt, rules=rules)
+    finally:
+        functions_all.cleanup()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="智能雷电 录像回放")
+    parser.add_argument("path")
+    parser.add_argument("--headless", action="store_true", help="不创建窗口，只运行游戏逻辑")
+    parser.add_argument("--realtime", action="store_true", help="带画面回放时按正常帧率播放")
+    parser.add_argument("--profile", help="无窗口回放时把cProfile结果写入该文件")
+    args = parser.parse_args(argv)
+
+    if not args.headless:
+        print(replay_rendered(args.path, args.realtime))
+        return
+
+    start = time.perf_counter()
+    if args.profile:
+        import cProfile
+
+        profile = cProfile.Profile()
+        game_vars = profile.runcall(replay_headless, args.path)
+        profile.dump_stats(args.profile)
+    else:
+        game_vars = replay_headless(args.path)
+    elapsed = time.perf_counter() - start
+    clock = game_vars.clock
+    print(f"ticks {clock.tick}  score {int(game_vars.score)}  game_over {game_vars.game_over}  "
+          f"{elapsed:.3f}s ({clock.tick * clock.dt / elapsed:.0f}x realtime)")
+
+
+if __name__ == "__main__":
+    main()
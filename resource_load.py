@@ -1,44 +1,74 @@
+from threading import Thread, Event
 import pygame
+from settings import GAME_WIDTH, GAME_HEIGHT, COLORS, FPS
+from asset_cache import IMAGE_PATHS, OPAQUE_SPRITES, collision_masks, load_cached_sprite, build_masks
 
-pygame.init()
-
-# 坐标映射参数
-CAMERA_WIDTH = 640
-CAMERA_HEIGHT = 480
-GAME_WIDTH = 512
-GAME_HEIGHT = 768
-
-# 资源文件路径
-IMAGE_PATHS = {
-    "bg0": "start_bg0.jpg",
-    "bg1": "map1.jpg",
-    "start": "start.png",
-    "plane": "plane.png",
-    "boss_1": "boss_1.png",
-    "boss_2": "boss_2.png",
-    "bullet": "alien_bullet.png",
-    "missile": "feidan.png",
-    "enemies": [f"alien_{i}.png" for i in range(1, 6)]
-}
+# 精灵缓存，由asset_loader在后台线程中填充，窗口创建后调用convert_sprites()统一转换为显示格式
+sprites = {}
+# 字体，键为FONT_SIZES中的大小名称及性能浮层用的"debug"，由load_fonts()在主线程中创建
+fonts = {}
+
+
+# 后台资源加载：在工作线程中读取图片（命中缓存时只做内存映射）并生成碰撞遮罩，
+# 主线程同时显示加载进度；全部完成后才写入sprites和collision_masks
+class AssetLoader:
+    def __init__(self):
+        self.total = sum(len(path) if isinstance(path, list) else 1 for path in IMAGE_PATHS.values())
+        self.done = 0
+        self.error = None
+        self.thread = None
+        self._finished = Event()
+
+    def start(self):
+        if self.thread is None:
+            self.thread = Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    # 已完成的比例（0~1）
+    def progress(self):
+        return self.done / self.total
+
+    # 等待加载完成，超时仍未完成时返回False；工作线程中的异常在这里重新抛出
+    def wait(self, timeout=None):
+        self.start()
+        finished = self._finished.wait(timeout)
+        if finished and self.error is not None:
+            raise self.error
+        return finished
+
+    def _load(self, name, path):
+        image = load_cached_sprite(name, path)
+        self.done += 1
+        return image
+
+    def _run(self):
+        try:
+            loaded = {name: [self._load(name, p) for p in path] if isinstance(path, list) else self._load(name, path)
+                      for name, path in IMAGE_PATHS.items()}
+            masks = build_masks(loaded)
+            sprites.update(loaded)
+            collision_masks.update(masks)
+        except BaseException as e:
+            self.error = e
+        finally:
+            self._finished.set()
 
-# 加载图片资源
-def load_image(path):
-    return pygame.image.load(path)
 
-# 背景图片
-bg0 = load_image(IMAGE_PATHS["bg0"])
-bg1 = load_image(IMAGE_PATHS["bg1"])
-start = load_image(IMAGE_PATHS["start"])
+asset_loader = AssetLoader()
 
-# 玩家飞机
-plane = load_image(IMAGE_PATHS["plane"])
 
-# BOSS图片
-boss_1_img = load_image(IMAGE_PATHS["boss_1"])
-boss_2_img = pygame.transform.scale(load_image(IMAGE_PATHS["boss_2"]), (577 // 2, 374 // 2))
+# 创建字体：pygame的字体模块不是线程安全的，只在主线程中调用，不放进加载线程
+def load_fonts():
+    if not fonts:
+        pygame.font.init()
+        fonts.update(create_fonts())
+
+
+# 同步加载全部资源，用于不显示加载界面的场合；只需要碰撞遮罩时用asset_cache.load_collision_masks()
+def load_assets():
+    asset_loader.wait()
+    load_fonts()
 
-# 敌人图片
-enemy_images = [load_image(path) for path in IMAGE_PATHS["enemies"]]
 
 # 字体
 FONT_SIZES = {
@@ -46,19 +76,110 @@ FONT_SIZES = {
     "medium": 36,
     "small": 25
 }
-myFont = pygame.font.SysFont("simhei", FONT_SIZES["large"])
-info_font = pygame.font.SysFont("simhei", FONT_SIZES["small"])
-score_font = pygame.font.SysFont("simhei", FONT_SIZES["medium"])
-
-# 颜色定义
-COLORS = {
-    "RED": (255, 0, 0),
-    "BLACK": (0, 0, 0),
-    "WHITE": (255, 255, 255),
-    "YELLOW": (255, 255, 0)
-}
+# 性能浮层使用的等宽小字体
+DEBUG_FONT_SIZE = 20
+
+# 打包进图集的小尺寸精灵
+ATLAS_SPRITES = ["plane", "bullet", "missile", "enemies"]
+ATLAS_MAX_WIDTH = 512
+ATLAS_PADDING = 1
+
+atlas = None
+# 按缩放比例预先缩放并转换好的精灵，只保留当前窗口大小对应的一份
+scaled_sprites = {}
+# 按缩放比例创建的字体，同样只保留一份
+scaled_fonts = {}
+
+
+# 按scale创建全套字体，键与fonts相同
+def create_fonts(scale=1.0):
+    created = {size_name: pygame.font.SysFont("simhei", max(1, round(size * scale)))
+               for size_name, size in FONT_SIZES.items()}
+    created["debug"] = pygame.font.Font(None, max(1, round(DEBUG_FONT_SIZE * scale)))
+    return created
+
+
+# 按行(shelf)打包：从高到低排列，放不下时另起一行，返回图集和每张图对应的区域
+def pack_atlas(surfaces, max_width=ATLAS_MAX_WIDTH, padding=ATLAS_PADDING):
+    order = sorted(range(len(surfaces)), key=lambda i: surfaces[i].get_height(), reverse=True)
+    rects = [None] * len(surfaces)
+    x = y = shelf_height = width = 0
+    for i in order:
+        w, h = surfaces[i].get_size()
+        if x > 0 and x + w > max_width:
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+        rects[i] = pygame.Rect(x, y, w, h)
+        x += w + padding
+        width = max(width, x)
+        shelf_height = max(shelf_height, h)
+
+    sheet = pygame.Surface((width, y + shelf_height), pygame.SRCALPHA)
+    for surface, rect in zip(surfaces, rects):
+        sheet.blit(surface, rect)
+    return sheet, rects
+
+
+# 把一组精灵原地转换为显示格式，并把小精灵打包成图集，返回图集
+def convert_sprite_set(sprite_set):
+    for name, image in sprite_set.items():
+        if name in ATLAS_SPRITES:
+            continue
+        sprite_set[name] = image.convert() if name in OPAQUE_SPRITES else image.convert_alpha()
+
+    small = []
+    for name in ATLAS_SPRITES:
+        small.extend(sprite_set[name] if isinstance(sprite_set[name], list) else [sprite_set[name]])
+    sheet, rects = pack_atlas(small)
+    sheet = sheet.convert_alpha()
+    regions = iter(sheet.subsurface(rect) for rect in rects)
+    for name in ATLAS_SPRITES:
+        if isinstance(sprite_set[name], list):
+            sprite_set[name] = [next(regions) for _ in sprite_set[name]]
+        else:
+            sprite_set[name] = next(regions)
+    return sheet
+
+
+# 将所有精灵一次性转换为显示格式，需在创建窗口之后调用
+def convert_sprites():
+    global atlas
+    if atlas is None:
+        atlas = convert_sprite_set(sprites)
+
+
+def scale_surface(surface, scale):
+    w, h = surface.get_size()
+    return pygame.transform.smoothscale(surface, (max(1, round(w * scale)), max(1, round(h * scale))))
+
+
+# 取得按scale缩放的整套精灵，每个缩放比例只从原图缩放一次，逐帧渲染不再缩放
+def get_scaled_sprites(scale):
+    if scale == 1.0:
+        return sprites
+    scaled = scaled_sprites.get(scale)
+    if scaled is None:
+        scaled_sprites.clear()
+        scaled = {name: [scale_surface(image, scale) for image in images] if isinstance(images, list)
+                  else scale_surface(images, scale)
+                  for name, images in sprites.items()}
+        convert_sprite_set(scaled)
+        scaled_sprites[scale] = scaled
+    return scaled
+
+
+# 取得按scale放大的字体，HUD文字随精灵一起缩放；字号需要重新创建字体，不缩放已渲染的文字
+def get_scaled_fonts(scale):
+    if scale == 1.0:
+        return fonts
+    scaled = scaled_fonts.get(scale)
+    if scaled is None:
+        scaled_fonts.clear()
+        scaled = scaled_fonts[scale] = create_fonts(scale)
+    return scaled
+
 
-# 其它
-FPS = 60
-NORMAL_TO_BOSS1 = 5
-BOSS1_TO_BOSS2 = 5
\ No newline at end of file
+# 窗口大小改变时丢弃旧的缩放结果
+def invalidate_scaled_sprites():
+    scaled_sprites.clear()
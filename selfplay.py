@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields
+import numpy as np
+from game_logic import InputCommand, run_headless
+from game_events import BossKilled, BossEscaped, GameOver
+from game_state import COLLISION_MODES, Rules
+from settings import GAME_WIDTH, TICK_RATE, WAVE_SCRIPT
+from waves import load_script
+
+# 批量自我对局：用启发式机器人在多进程中无窗口地跑大量固定种子的对局，汇总存活时间、得分和Boss逃跑情况，
+# 用于调整数值规则。只依赖纯逻辑核心，默认按圆形碰撞；指定--rule collision=mask时各进程会加载一次精灵遮罩
+
+DEFAULT_SESSIONS = 1000
+# 单局最长模拟时长（秒），到达后按存活结束
+DEFAULT_MAX_TIME = 600.0
+SEED_BASE = 1000
+# 躲避判断：子弹或敌机进入飞机上方该距离内且水平方向重叠时开始躲避
+DODGE_DISTANCE = 220
+DODGE_MARGIN = 12
+AIM_TOLERANCE = 20
+
+
+# 启发式机器人（键盘控制）：先躲避即将落到飞机上的子弹和敌机，否则对准最低的敌机或Boss开火
+def heuristic_bot(game_vars):
+    player = game_vars.player
+    left, right = player.x - DODGE_MARGIN, player.x + player.w + DODGE_MARGIN
+    center = player.x + player.w / 2
+
+    threat = None
+    for pool in (game_vars.projectiles.bullets, game_vars.wave.enemies):
+        if not pool.count:
+            continue
+        high = pool.high
+        x, y = pool.x[:high], pool.y[:high]
+        near = (pool.alive[:high] & (y + pool.h > player.y - DODGE_DISTANCE) & (y < player.y + player.h) &
+                (x + pool.w > left) & (x < right))
+        if near.any():
+            i = np.flatnonzero(near)[np.argmax(y[near])]
+            threat = x[i] + pool.w / 2
+            break
+
+    boss = game_vars.boss
+    enemies = game_vars.wave.enemies
+    if boss.active:
+        target = boss.x + boss.w / 2
+    elif enemies.count:
+        i = enemies.indices()
+        i = i[np.argmax(enemies.y[i])]
+        target = enemies.x[i] + enemies.w / 2
+    else:
+        target = GAME_WIDTH / 2
+
+    if threat is not None:
+        # 向离威胁更远且还有空间的一侧躲避
+        go_left = threat > center if player.x > player.w else False
+        if player.x + player.w >= GAME_WIDTH - player.w:
+            go_left = True
+        return InputCommand(left=go_left, right=not go_left, fire=abs(target - center) < AIM_TOLERANCE)
+
+    return InputCommand(left=center > target + AIM_TOLERANCE / 2, right=center < target - AIM_TOLERANCE / 2,
+                        fire=abs(target - center) < AIM_TOLERANCE)
+
+
+# 单局的事件统计
+class SessionStats:
+    def __init__(self):
+        self.boss_killed = Counter()
+        self.boss_escaped = Counter()
+        self.game_over_reason = None
+
+    def __call__(self, event):
+        if isinstance(event, BossKilled):
+            self.boss_killed[event.boss] += 1
+        elif isinstance(event, BossEscaped):
+            self.boss_escaped[event.boss] += 1
+        elif isinstance(event, GameOver) and self.game_over_reason is None:
+            self.game_over_reason = event.reason
+
+
+def play_session(seed, rules=None, max_time=DEFAULT_MAX_TIME, script_path=WAVE_SCRIPT):
+    stats = SessionStats()
+    game_vars = run_headless(heuristic_bot, control_type=1, seed=seed, max_ticks=int(max_time * TICK_RATE),
+                             rules=rules, events=stats, script=load_script(script_path, rules))
+    return {
+        "seed": seed,
+        "survival_time": game_vars.clock.current_time,
+        "score": int(game_vars.score),
+        "game_over": game_vars.game_over,
+        "reason": stats.game_over_reason or "timeout",
+        "boss1_killed": stats.boss_killed[1],
+        "boss2_killed": stats.boss_killed[2],
+        "boss1_escaped": stats.boss_escaped[1],
+        "boss2_escaped": stats.boss_escaped[2],
+        "speed_multiplier": game_vars.speed_multiplier,
+        "accuracy": game_vars.combo.accuracy(),
+    }
+
+
+# 进程池中按批执行，减少进程间传递任务的开销
+def play_batch(seeds, rules, max_time, script_path):
+    return [play_session(seed, rules, max_time, script_path) for seed in seeds]
+
+
+def describe(values):
+    values = np.asarray(values, dtype=np.float64)
+    return {"mean": float(values.mean()), "p10": float(np.percentile(values, 10)),
+            "p50": float(np.percentile(values, 50)), "p90": float(np.percentile(values, 90)),
+            "max": float(values.max())}
+
+
+def aggregate(results):
+    def total(key):
+        return sum(r[key] for r in results)
+
+    report = {
+        "sessions": len(results),
+        "survival_time": describe([r["survival_time"] for r in results]),
+        "score": describe([r["score"] for r in results]),
+        "accuracy": describe([r["accuracy"] for r in results]),
+        "end_reasons": dict(Counter(r["reason"] for r in results)),
+    }
+    for boss in (1, 2):
+        killed, escaped = total(f"boss{boss}_killed"), total(f"boss{boss}_escaped")
+        report[f"boss{boss}"] = {
+            "killed": killed,
+            "escaped": escaped,
+            "escape_rate": escaped / (killed + escaped) if killed + escaped else 0.0,
+            "sessions_reached": sum(1 for r in results if r[f"boss{boss}_killed"] or r[f"boss{boss}_escaped"]),
+        }
+    return report
+
+
+def run_selfplay(sessions=DEFAULT_SESSIONS, workers=None, seed_base=SEED_BASE, rules=None, max_time=DEFAULT_MAX_TIME,
+                 script_path=WAVE_SCRIPT):
+    seeds = list(range(seed_base, seed_base + sessions))
+    workers = workers or os.cpu_count() or 1
+    # 每个进程分到若干批，批次足够多时各核心负载更均衡
+    batch_size = max(1, min(32, sessions // (workers * 4)))
+    batches = [seeds[i:i + batch_size] for i in range(0, sessions, batch_size)]
+
+    results = []
+    if workers == 1:
+        for batch in batches:
+            results.extend(play_batch(batch, rules, max_time, script_path))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for batch_results in executor.map(play_batch, batches, [rules] * len(batches),
+                                              [max_time] * len(batches), [script_path] * len(batches)):
+                results.extend(batch_results)
+    return results
+
+
+def print_report(report, wall, workers):
+    survival, score = report["survival_time"], report["score"]
+    print(f"{report['sessions']} sessions on {workers} workers in {wall:.1f}s "
+          f"({report['sessions'] / wall:.1f} sessions/s)")
+    print(f"survival  mean {survival['mean']:.1f}s  p10 {survival['p10']:.1f}  p50 {survival['p50']:.1f}  "
+          f"p90 {survival['p90']:.1f}  max {survival['max']:.1f}")
+    print(f"score     mean {score['mean']:.1f}  p10 {score['p10']:.0f}  p50 {score['p50']:.0f}  "
+          f"p90 {score['p90']:.0f}  max {score['max']:.0f}")
+    for boss in (1, 2):
+        b = report[f"boss{boss}"]
+        print(f"boss{boss}     killed {b['killed']}  escaped {b['escaped']}  escape rate {b['escape_rate']:.1%}  "
+              f"reached in {b['sessions_reached']} sessions")
+    print("end       " + "  ".join(f"{reason} {count}" for reason, count in sorted(report["end_reasons"].items())))
+
+
+# 解析--rule name=value，按Rules字段声明的类型转换（默认值恰好是整数的float字段也接受小数）
+def parse_rules(assignments):
+    types = {f.name: f.type for f in fields(Rules)}
+    values = {}
+    for assignment in assignments:
+        name, _, value = assignment.partition("=")
+        if name not in types:
+            raise SystemExit(f"未知规则 {name}，可用: {', '.join(types)}")
+        try:
+            values[name] = types[name](value)
+        except ValueError:
+            raise SystemExit(f"规则 {name} 的值无效: {value!r}，应为{types[name].__name__}")
+    if values.get("collision", COLLISION_MODES[0]) not in COLLISION_MODES:
+        raise SystemExit(f"规则 collision 的值无效: {values['collision']!r}，可用: {', '.join(COLLISION_MODES)}")
+    return Rules(**values)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="智能雷电 批量自我对局")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS)
+    parser.add_argument("--workers", type=int, help="进程数，默认为CPU核数")
+    parser.add_argument("--seed", type=int, default=SEED_BASE, help="第一局的随机种子，之后依次加1")
+    parser.add_argument("--max-time", type=float, default=DEFAULT_MAX_TIME, help="单局最长模拟时长（秒）")
+    parser.add_argument("--rule", action="append", default=[], metavar="NAME=VALUE",
+                        help="覆盖数值规则，如boss1_health=150，可重复")
+    parser.add_argument("--script", default=WAVE_SCRIPT, help="波次脚本文件")
+    parser.add_argument("--output", help="把汇总结果和规则写入JSON文件")
+    args = parser.parse_args(argv)
+
+    rules = parse_rules(args.rule)
+    workers = args.workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    load_script(args.script, rules)
+    results = run_selfplay(args.sessions, workers, args.seed, rules, args.max_time, args.script)
+    wall = time.perf_counter() - start
+
+    report = aggregate(results)
+    print_report(report, wall, workers)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rules": asdict(rules), "script": args.script, "seed": args.seed, "max_time": args.max_time,
+                       "wall_time": wall, "report": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# 坐标映射参数
+CAMERA_WIDTH = 640
+CAMERA_HEIGHT = 480
+GAME_WIDTH = 512
+GAME_HEIGHT = 768
+
+# 颜色定义
+COLORS = {
+    "RED": (255, 0, 0),
+    "BLACK": (0, 0, 0),
+    "WHITE": (255, 255, 255),
+    "YELLOW": (255, 255, 0)
+}
+
+# 窗口：逻辑画面固定为GAME_WIDTH×GAME_HEIGHT，按窗口大小等比缩放并居中显示，运行中可拖动改变窗口大小，F11切换全屏
+WINDOW_SIZE = (GAME_WIDTH, GAME_HEIGHT)
+FULLSCREEN = False
+
+# 精灵在逻辑画面中的尺寸（宽, 高），图片加载时缩放到该尺寸，碰撞半径也由它得出
+SPRITE_SIZES = {
+    "plane": (100, 148),
+    "boss_1": (270, 175),
+    "boss_2": (577 // 2, 374 // 2),
+    "bullet": (44, 48),
+    "missile": (21, 59),
+    "enemies": (128, 128),
+}
+
+# 其它
+# 显示帧率上限，可设为30、120、144等，0为不限帧率；游戏逻辑始终按TICK_RATE固定步长推进，玩法不受显示帧率影响
+FPS = 60
+# 逻辑帧率（每秒逻辑帧数）
+TICK_RATE = 60
+# 单帧计入的最长时间（秒），卡顿后不会一次追赶过多逻辑帧
+MAX_FRAME_TIME = 0.25
+NORMAL_TO_BOSS1 = 5
+BOSS1_TO_BOSS2 = 5
+# Boss血量、导弹对Boss的伤害范围、击落Boss2后的速度倍率、Boss停留多久（秒）后逃跑及逃跑扣分
+BOSS1_HEALTH = 100
+BOSS2_HEALTH = 200
+BOSS_DAMAGE = (10, 20)
+BOSS2_SPEED_UP = 1.5
+BOSS_ESCAPE_TIME = 5
+BOSS_ESCAPE_PENALTY = (10, 20)
+# 资源解码缓存目录：图片解码并缩放后的未压缩像素存放在这里，下次启动直接内存映射；None为不缓存
+ASSET_CACHE_DIR = ".asset_cache"
+# 带画面游戏的碰撞检测方式："circle"为按精灵短边的内切圆近似，"mask"为按精灵不透明像素精确判断（先用外接圆粗筛）；
+# 无窗口模拟（run_headless、selfplay.py）默认按圆形近似，可用Rules.collision单独指定
+COLLISION_MODE = "mask"
+# 波次脚本：敌机阶段、Boss阶段及其弹幕的描述文件
+WAVE_SCRIPT = "waves.json"
+# 连击：时间窗口（秒），(窗口内命中数, 每次连击得分)档位，以及环形缓冲区容量
+COMBO_WINDOW = 0.5
+COMBO_TIERS = ((2, 1), (4, 2), (6, 3))
+COMBO_CAPACITY = 64
+# 每种控制方式的排行榜保留的记录数
+LEADERBOARD_SIZE = 10
+
+# 事件日志：控制台输出的最低级别（"DEBUG"、"INFO"、"WARNING"），每种事件每秒最多输出的条数（None为不限），
+# 以及记录全部事件的JSONL文件（None为不记录）
+LOG_LEVEL = "INFO"
+LOG_RATE_LIMIT = 20
+EVENT_LOG_FILE = None
+
+# 渲染：只重绘和提交发生变化的区域
+DIRTY_RECT_RENDERING = True
+# 开始和结束界面等待事件的超时（毫秒），界面空闲时不重绘
+MENU_EVENT_TIMEOUT = 1000
+
+# 人脸检测：在缩小后的画面上检测，并优先在上次人脸附近的区域内跟踪
+FACE_DETECT_SCALE = 0.5
+FACE_ROI_MARGIN = 0.5
+FACE_MIN_SIZE = 50
+# 是否显示摄像头预览窗口
+FACE_PREVIEW = True
+# 超过该时长（秒）的人脸样本视为过期并丢弃
+FACE_SAMPLE_MAX_AGE = 0.25
+# 人脸位置向前外推的时长（秒），补偿从读取输入到画面显示的延迟
+FACE_PREDICTION_LEAD = 1 / TICK_RATE
+# 人脸检测运行位置："thread"为游戏进程内的线程，"process"为独立子进程（避免与主循环争抢GIL）
+FACE_WORKER = "thread"
+
+# 性能分析：F3切换浮层；设置文件路径后每局结束导出逐帧数据（.csv或Chrome trace的.json）
+PROFILER_OVERLAY = False
+PROFILE_TRACE_FILE = None
+
+# 录像：设置目录后每局都把随机种子和逐帧输入写入该目录，可用replay.py回放
+REPLAY_RECORD_DIR = None
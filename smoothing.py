@@ -0,0 +1,88 @@
+import math
+
+# One-Euro滤波参数：静止时强平滑去抖，快速移动时降低平滑以减小延迟
+ONE_EURO_MIN_CUTOFF = 1.0
+ONE_EURO_BETA = 0.02
+ONE_EURO_D_CUTOFF = 1.0
+# 外推到渲染时刻时最多向前预测的时间（秒）
+MAX_PREDICTION = 0.1
+
+
+def smoothing_factor(dt, cutoff):
+    r = 2 * math.pi * cutoff * dt
+    return r / (r + 1)
+
+
+# 一维One-Euro滤波器（Casiez等，2012），同时维护平滑后的速度用于外推
+class OneEuroFilter:
+    def __init__(self, min_cutoff=ONE_EURO_MIN_CUTOFF, beta=ONE_EURO_BETA, d_cutoff=ONE_EURO_D_CUTOFF):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.velocity = 0.0
+        self.timestamp = None
+
+    def filter(self, timestamp, value):
+        if self.value is None:
+            self.value = value
+            self.velocity = 0.0
+            self.timestamp = timestamp
+            return value
+
+        dt = timestamp - self.timestamp
+        if dt <= 0:
+            return self.value
+
+        a_d = smoothing_factor(dt, self.d_cutoff)
+        self.velocity += a_d * ((value - self.value) / dt - self.velocity)
+
+        cutoff = self.min_cutoff + self.beta * abs(self.velocity)
+        a = smoothing_factor(dt, cutoff)
+        self.value += a * (value - self.value)
+        self.timestamp = timestamp
+        return self.value
+
+    # 按当前速度外推到指定时刻
+    def predict(self, timestamp, max_prediction=MAX_PREDICTION):
+        lead = min(max(timestamp - self.timestamp, 0.0), max_prediction)
+        return self.value + self.velocity * lead
+
+
+# 二维人脸位置跟踪：只处理新序号的样本，丢弃过期样本，并外推到渲染时刻
+class FaceTracker:
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self.filter_x = OneEuroFilter()
+        self.filter_y = OneEuroFilter()
+        self.last_seq = 0
+
+    def reset(self):
+        self.filter_x.reset()
+        self.filter_y.reset()
+        self.last_seq = 0
+
+    # sample为通道返回的(序号, 时间戳, x, y)，返回目标时刻的位置，没有可用样本时返回None
+    def position(self, sample, now, target_time):
+        if sample is None:
+            return None
+
+        seq, timestamp, x, y = sample
+        if math.isnan(x) or now - timestamp > self.max_age:
+            # 人脸丢失或样本过期，下次重新开始滤波以免沿用旧速度
+            self.filter_x.reset()
+            self.filter_y.reset()
+            self.last_seq = seq
+            return None
+
+        if seq != self.last_seq:
+            self.last_seq = seq
+            self.filter_x.filter(timestamp, x)
+            self.filter_y.filter(timestamp, y)
+
+        if self.filter_x.value is None:
+            return None
+        return self.filter_x.predict(target_time), self.filter_y.predict(target_time)
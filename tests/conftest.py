@@ -0,0 +1,21 @@
+import os
+import sys
+
+# 游戏模块都在仓库根目录，资源和波次脚本按相对路径读取，测试从根目录运行
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np
+from game_events import EventBus
+
+
+# 比较两个snapshot_state快照：其中混有numpy数组，逐项比较；事件总线只是引用，不属于状态
+def same_snapshot(a, b):
+    if isinstance(a, EventBus):
+        return True
+    if isinstance(a, np.ndarray):
+        return np.array_equal(a, b)
+    if isinstance(a, (tuple, list)):
+        return len(a) == len(b) and all(same_snapshot(x, y) for x, y in zip(a, b))
+    return a == b
@@ -0,0 +1,35 @@
+import numpy as np
+from collision import BRUTE_FORCE_LIMIT, circle_pairs
+
+
+def brute_force(ax, ay, ar, bx, by, br):
+    pairs = [(i, j) for i in range(len(ax)) for j in range(len(bx))
+             if (ax[i] - bx[j]) ** 2 + (ay[i] - by[j]) ** 2 <= (ar[i] + br[j]) ** 2]
+    return [p[0] for p in pairs], [p[1] for p in pairs]
+
+
+def random_circles(rng, n, radius):
+    return rng.uniform(0, 480, n), rng.uniform(0, 640, n), rng.uniform(radius / 2, radius, n)
+
+
+# 稠密矩阵（小组）和排序扫描（大组）两个分支都与逐对比较结果一致，输出按ia、ib升序
+def test_circle_pairs_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for na, nb, radius in ((0, 5, 10), (5, 0, 10), (3, 7, 40), (40, 60, 20), (150, 200, 15), (300, 20, 60)):
+        a = random_circles(rng, na, radius)
+        b = random_circles(rng, nb, radius)
+        ia, ib = circle_pairs(*a, *b)
+        expected_a, expected_b = brute_force(*a, *b)
+        assert list(ia) == expected_a
+        assert list(ib) == expected_b
+
+
+# 恰好相切也算相交，与稠密分支的<=一致
+def test_touching_circles_intersect():
+    n = 100
+    ax, ay, ar = np.arange(n) * 100.0, np.zeros(n), np.full(n, 5.0)
+    bx, by, br = ax + 10.0, np.zeros(n), np.full(n, 5.0)
+    assert n * n > BRUTE_FORCE_LIMIT
+    ia, ib = circle_pairs(ax, ay, ar, bx, by, br)
+    assert list(ia) == list(range(n))
+    assert list(ib) == list(range(n))
@@ -0,0 +1,67 @@
+import numpy as np
+from entity_pool import BulletPool, EntityPool
+
+
+def test_spawn_until_full():
+    pool = EntityPool(4, 10, 10)
+    indices = [pool.spawn(i, 0) for i in range(4)]
+    assert sorted(indices) == [0, 1, 2, 3]
+    assert pool.spawn(0, 0) == -1
+    assert pool.count == 4 and pool.high == 4
+
+
+# 释放的槽位优先复用，high不回退，逐帧运算只看存活标记
+def test_kill_reuses_slots():
+    pool = EntityPool(8, 10, 10)
+    for i in range(5):
+        pool.spawn(i * 10.0, 0)
+    pool.kill(1)
+    pool.kill(1)
+    assert pool.count == 4
+    assert pool.spawn(99.0, 0) == 1
+    assert pool.x[1] == 99.0
+
+    mask = np.zeros(8, dtype=bool)
+    mask[[0, 2, 6]] = True
+    assert pool.kill_mask(mask) == 2
+    assert list(pool.indices()) == [1, 3, 4]
+    assert pool.high == 5
+
+
+def test_integrate_and_cull():
+    pool = EntityPool(4, 10, 10)
+    a = pool.spawn(0.0, 0.0, vx=30.0, vy=60.0)
+    b = pool.spawn(0.0, 95.0, vy=60.0)
+    pool.integrate(0.5)
+    assert (pool.x[a], pool.y[a]) == (15.0, 30.0)
+    assert (pool.prev_x[a], pool.prev_y[a]) == (0.0, 0.0)
+    draw_x, draw_y = pool.interpolated(0.5)
+    assert (draw_x[a], draw_y[a]) == (7.5, 15.0)
+    assert pool.cull_outside(0, 0, 100, 100) == 1
+    assert list(pool.indices()) == [a]
+    assert not pool.alive[b]
+
+
+def test_snapshot_restore():
+    pool = BulletPool(8, 4, 4)
+    pool.emit(50.0, 50.0, np.array([0.0, np.pi / 2]), 100.0, spawn_time=0.0)
+    saved = pool.snapshot()
+    x = pool.x[:pool.high].copy()
+
+    pool.advance(1.0)
+    pool.spawn(0.0, 0.0)
+    pool.kill(0)
+    pool.restore(saved)
+    assert pool.count == 2
+    assert np.array_equal(pool.x[:pool.high], x)
+    assert list(pool.indices()) == [0, 1]
+
+
+# 子弹位置由参数方程直接求出，不随调用次数累积误差
+def test_bullet_advance():
+    pool = BulletPool(8, 4, 4)
+    assert pool.emit(50.0, 50.0, np.array([0.0, np.pi / 2]), 100.0, spawn_time=1.0) == 2
+    pool.advance(1.5)
+    pool.advance(3.0)
+    assert np.allclose(pool.x[:2], [250.0, 50.0])
+    assert np.allclose(pool.y[:2], [50.0, 250.0])
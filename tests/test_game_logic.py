@@ -0,0 +1,36 @@
+from conftest import same_snapshot
+from game_logic import run_headless
+from game_state import snapshot_state
+from selfplay import heuristic_bot
+from settings import TICK_RATE
+
+TICKS = 60 * TICK_RATE
+
+
+def play(seed):
+    events = []
+    game_vars = run_headless(heuristic_bot, seed=seed, max_ticks=TICKS, events=events.append)
+    return game_vars, events
+
+
+# 同一种子、同一策略的两局逐帧完全一致
+def test_run_headless_is_deterministic():
+    for seed in (1, 7, 1234):
+        a, events_a = play(seed)
+        b, events_b = play(seed)
+        assert a.clock.tick == b.clock.tick
+        assert a.score == b.score
+        assert events_a == events_b
+        assert same_snapshot(snapshot_state(a), snapshot_state(b))
+
+
+def test_different_seeds_diverge():
+    a, _ = play(1)
+    b, _ = play(2)
+    assert not same_snapshot(snapshot_state(a), snapshot_state(b))
+
+
+def test_max_ticks_stops_the_run():
+    game_vars = run_headless([], seed=3, max_ticks=10)
+    assert game_vars.clock.tick == 10
+    assert not game_vars.game_over
@@ -0,0 +1,37 @@
+import pytest
+from conftest import same_snapshot
+from game_logic import init_game_variables, run_headless, step_game
+from game_state import snapshot_state, restore_state
+from selfplay import heuristic_bot
+from settings import TICK_RATE
+
+
+# 状态类都用__slots__，拼错的属性名直接报错而不是悄悄新增字段
+def test_state_is_slotted():
+    game_vars = init_game_variables(1, seed=1)
+    for state in (game_vars, game_vars.player, game_vars.wave, game_vars.boss, game_vars.projectiles,
+                  game_vars.clock):
+        with pytest.raises(AttributeError):
+            state.scroe = 1
+
+
+# 恢复快照后重放同样的输入，得到与第一次相同的状态；实体池原地恢复，不重新分配
+def test_restore_state_replays_identically():
+    game_vars = run_headless(heuristic_bot, seed=42, max_ticks=10 * TICK_RATE)
+    saved = snapshot_state(game_vars)
+    enemies = game_vars.wave.enemies
+
+    commands = []
+    for _ in range(10 * TICK_RATE):
+        command = heuristic_bot(game_vars)
+        commands.append(command)
+        if not step_game(game_vars, command):
+            break
+    first = snapshot_state(game_vars)
+
+    restore_state(game_vars, saved)
+    assert game_vars.wave.enemies is enemies
+    assert same_snapshot(snapshot_state(game_vars), saved)
+    for command in commands:
+        step_game(game_vars, command)
+    assert same_snapshot(snapshot_state(game_vars), first)
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+from conftest import ROOT
+
+# 在新进程中运行，确认无窗口模拟不会导入pygame（包括创建字体的pygame.font）
+HEADLESS_SCRIPT = """
+import sys
+from game_logic import InputCommand, run_headless
+game_vars = run_headless([InputCommand(fire=True)] * 600, seed=7)
+assert game_vars.clock.tick > 0
+print(sorted(name for name in sys.modules if name == "resource_load" or name.startswith("pygame")))
+"""
+
+
+def test_run_headless_does_not_import_pygame():
+    result = subprocess.run([sys.executable, "-c", HEADLESS_SCRIPT], cwd=ROOT, capture_output=True, text=True,
+                            check=True)
+    assert result.stdout.strip() == "[]"
+
+
+# 像素碰撞模式只加载遮罩：不导入resource_load，不初始化pygame和字体
+MASK_SCRIPT = """
+import sys
+import pygame
+from game_logic import InputCommand, run_headless
+from game_state import Rules
+game_vars = run_headless([InputCommand(fire=True)] * 600, seed=7, rules=Rules(collision="mask"))
+assert game_vars.masks is not None
+print("resource_load" in sys.modules, pygame.get_init(), pygame.font.get_init())
+"""
+
+
+def test_mask_mode_loads_only_masks():
+    result = subprocess.run([sys.executable, "-c", MASK_SCRIPT], cwd=ROOT, capture_output=True, text=True,
+                            check=True)
+    assert result.stdout.splitlines()[-1] == "False False False"
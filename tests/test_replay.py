@@ -0,0 +1,50 @@
+from game_logic import InputCommand, run_headless
+from replay import InputRecorder, decode_commands, encode_command, load_replay, replay_headless
+from selfplay import heuristic_bot
+from settings import TICK_RATE
+
+
+def test_commands_round_trip():
+    commands = [InputCommand(), InputCommand(left=True, fire=True), InputCommand(right=True, up=True, down=True),
+                InputCommand(pointer=(-3, 640)), InputCommand(face=(0.25, 0.75), fire=True),
+                InputCommand(left=True, pointer=(120, 32000), face=(1.0, -0.5))]
+    data = b"".join(encode_command(command) for command in commands)
+    assert decode_commands(data, 0) == commands
+
+
+# 录制一局后无窗口回放，结果与原局一致
+def test_recorded_session_replays_identically(tmp_path):
+    path = str(tmp_path / "session.rpl")
+    seed, dt = 99, 1 / TICK_RATE
+    recorder = InputRecorder(path, 1, seed, dt, "circle")
+
+    def recording_bot(game_vars):
+        command = heuristic_bot(game_vars)
+        recorder.record(command)
+        return command
+
+    original = run_headless(recording_bot, seed=seed, dt=dt, max_ticks=30 * TICK_RATE)
+    recorder.close()
+
+    control_type, loaded_seed, loaded_dt, rules, commands = load_replay(path)
+    assert (control_type, loaded_seed, loaded_dt, rules.collision) == (1, seed, dt, "circle")
+    assert len(commands) == original.clock.tick
+
+    replayed = replay_headless(path)
+    assert replayed.clock.tick == original.clock.tick
+    assert replayed.score == original.score
+    assert replayed.player.x == original.player.x
+    assert replayed.game_over == original.game_over
+
+
+# 同名录像已存在（同一秒内结束的两局）时另取文件名，不覆盖
+def test_recorder_does_not_overwrite(tmp_path):
+    path = str(tmp_path / "session.rpl")
+    paths = []
+    for seed in (1, 2):
+        recorder = InputRecorder(path, 1, seed, 1 / TICK_RATE, "circle")
+        recorder.record(InputCommand(fire=True))
+        recorder.close()
+        paths.append(recorder.path)
+    assert paths[0] != paths[1]
+    assert [load_replay(p)[1] for p in paths] == [1, 2]
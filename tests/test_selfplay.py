@@ -0,0 +1,14 @@
+import pytest
+from selfplay import parse_rules
+
+
+# --rule按Rules字段声明的类型转换，默认值恰好是整数的float字段也接受小数
+def test_parse_rules_casts_by_annotation():
+    rules = parse_rules(["boss_escape_time=2.5", "boss1_health=150", "collision=mask"])
+    assert (rules.boss_escape_time, rules.boss1_health, rules.collision) == (2.5, 150, "mask")
+
+
+@pytest.mark.parametrize("assignment", ["nope=1", "boss1_health=2.5", "collision=foo"])
+def test_parse_rules_rejects_bad_values(assignment):
+    with pytest.raises(SystemExit):
+        parse_rules([assignment])
@@ -0,0 +1,63 @@
+import pygame
+from collections import OrderedDict
+
+TEXT_CACHE_SIZE = 128
+
+
+# 文字表面缓存：以(字体, 文本, 颜色)为键，按最近最少使用(LRU)淘汰
+class TextCache:
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self._cache.get(key)
+        if surface is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        self._cache[key] = surface
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._cache.clear()
+
+
+text_cache = TextCache()
+
+
+def render_text(font, text, color):
+    return text_cache.render(font, text, color)
+
+
+# HUD文字控件：只在显示的值变化时才重新取文字表面
+class HudText:
+    def __init__(self, font, template, color, cache=text_cache):
+        self.font = font
+        self.template = template
+        self.color = color
+        self.cache = cache
+        self.value = None
+        self.surface = None
+
+    # 换用另一字体（窗口缩放后），下次update时重新渲染
+    def set_font(self, font):
+        if font is not self.font:
+            self.font = font
+            self.surface = None
+
+    def update(self, value):
+        if self.surface is None or value != self.value:
+            self.value = value
+            self.surface = self.cache.render(self.font, self.template.format(value), self.color)
+        return self.surface
@@ -0,0 +1,24 @@
+import pygame
+from settings import GAME_WIDTH, GAME_HEIGHT
+
+
+# 逻辑画面到窗口的映射：逻辑画面固定为GAME_WIDTH×GAME_HEIGHT，按窗口等比缩放后居中，两侧或上下留黑边
+class Viewport:
+    def __init__(self, size=(GAME_WIDTH, GAME_HEIGHT)):
+        self.update(size)
+
+    def update(self, size):
+        window_w, window_h = size
+        self.scale = min(window_w / GAME_WIDTH, window_h / GAME_HEIGHT)
+        self.width = max(1, round(GAME_WIDTH * self.scale))
+        self.height = max(1, round(GAME_HEIGHT * self.scale))
+        self.x = (window_w - self.width) // 2
+        self.y = (window_h - self.height) // 2
+        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def to_screen(self, x, y):
+        return self.x + x * self.scale, self.y + y * self.scale
+
+    # 窗口坐标转换为逻辑坐标（取整，鼠标指令按整数记录）
+    def to_world(self, x, y):
+        return int((x - self.x) / self.scale), int((y - self.y) / self.scale)
@@ -0,0 +1,164 @@
+import json
+from collections import namedtuple
+from dataclasses import astuple
+from settings import WAVE_SCRIPT
+from game_state import Rules
+from bullet_patterns import PATTERNS
+
+# 波次脚本：关卡进度由JSON文件描述，启动时编译一次为按顺序排列的阶段表，
+# 每个敌机阶段内的定时生成再编译为按时间排序的生成表，逐帧只需推进游标，不再重复判断条件。
+# 数值字段既可以直接写数字，也可以写Rules的字段名，由当前规则提供（便于selfplay.py批量调参）
+
+# 子弹发射方式：pattern为弹幕类型，speed为子弹速度（像素/秒），cooldown为两次发射的间隔（秒，敌机阶段由场上所有敌机共用），
+# chance为敌机到达发射时间时实际开火的概率，delay为敌机生成后首次发射前的随机延迟范围，max_bullets为场上子弹上限；
+# count为每次发射的子弹数，arc为扇形张角（度），spin为螺旋每秒旋转的角度，turn为子弹飞行中每秒转向的角度
+FireSpec = namedtuple("FireSpec", ["pattern", "speed", "cooldown", "chance", "delay", "max_bullets",
+                                   "count", "arc", "spin", "turn"])
+# 定时生成的一架敌机：time为相对阶段开始的秒数，x和kind为None时随机
+SpawnEntry = namedtuple("SpawnEntry", ["time", "x", "kind"])
+# 敌机阶段：击落kills架后进入下一阶段；spawns为None时随机持续生成，场上最多max_alive架
+EnemyPhase = namedtuple("EnemyPhase", ["kills", "max_alive", "speed", "spawns", "fire"])
+# Boss形态：血量比例不高于health时切换到该形态的发射方式
+BossStage = namedtuple("BossStage", ["health", "fire"])
+# Boss阶段：speed为入场速度，on_kill和on_escape为击落或逃跑后跳转到的阶段下标
+BossPhase = namedtuple("BossPhase", ["boss", "health", "speed", "escape_time", "escape_penalty", "speed_up",
+                                     "on_kill", "on_escape", "stages"])
+# boss1_required：脚本每轮中Boss1阶段的个数，只用于进度提示
+WaveScript = namedtuple("WaveScript", ["phases", "boss1_required"])
+
+DEFAULT_FIRE = {"pattern": "single", "speed": 300, "cooldown": 2, "chance": 1.0, "delay": [0.5, 1.5],
+                "max_bullets": 1, "count": 1, "arc": 0, "spin": 0, "turn": 0}
+JUMPS = ("next", "previous", "restart")
+
+_sources = {}
+_compiled = {}
+
+
+def _value(spec, key, rules, default=None):
+    value = spec.get(key, default)
+    if isinstance(value, str):
+        if not hasattr(rules, value):
+            raise ValueError(f"波次脚本中的未知规则: {value}")
+        value = getattr(rules, value)
+    if value is None:
+        raise ValueError(f"波次脚本缺少字段: {key}")
+    return value
+
+
+def _compile_fire(spec, rules):
+    if spec is None:
+        return None
+    spec = {**DEFAULT_FIRE, **spec}
+    if spec["pattern"] not in PATTERNS:
+        raise ValueError(f"未知的弹幕类型: {spec['pattern']}，可用: {', '.join(PATTERNS)}")
+    count = int(_value(spec, "count", rules))
+    if count < 1:
+        raise ValueError("弹幕的count至少为1")
+    low, high = spec["delay"]
+    return FireSpec(spec["pattern"], float(_value(spec, "speed", rules)), float(_value(spec, "cooldown", rules)),
+                    float(_value(spec, "chance", rules)), (float(low), float(high)),
+                    int(_value(spec, "max_bullets", rules)), count, float(_value(spec, "arc", rules)),
+                    float(_value(spec, "spin", rules)), float(_value(spec, "turn", rules)))
+
+
+# 展开定时生成：每条可用count、every、dx描述一列等间隔出现的敌机，展开后按时间排序
+def _compile_spawns(entries, rules):
+    if entries is None:
+        return None
+    spawns = []
+    for entry in entries:
+        count = int(_value(entry, "count", rules, 1))
+        every = float(_value(entry, "every", rules, 0))
+        dx = float(_value(entry, "dx", rules, 0))
+        at = float(_value(entry, "at", rules, 0))
+        x, kind = entry.get("x"), entry.get("kind")
+        for i in range(count):
+            spawns.append(SpawnEntry(at + i * every, None if x is None else x + i * dx, kind))
+    spawns.sort(key=lambda spawn: spawn.time)
+    return tuple(spawns)
+
+
+def _compile_enemies(spec, rules):
+    spawns = _compile_spawns(spec.get("spawns"), rules)
+    kills = spec.get("kills")
+    if kills is None and spawns is None:
+        raise ValueError("随机生成的敌机阶段必须指定kills")
+    return EnemyPhase(None if kills is None else int(_value(spec, "kills", rules)),
+                      int(_value(spec, "max_alive", rules, 1)), float(_value(spec, "speed", rules, 120)),
+                      spawns, _compile_fire(spec.get("fire"), rules))
+
+
+def _compile_boss(spec, rules, index, count):
+    jumps = {"next": (index + 1) % count, "previous": max(index - 1, 0), "restart": 0}
+    on_kill, on_escape = spec.get("on_kill", "next"), spec.get("on_escape", "next")
+    for jump in (on_kill, on_escape):
+        if jump not in JUMPS:
+            raise ValueError(f"未知的跳转: {jump}，可用: {', '.join(JUMPS)}")
+
+    # 第一个形态为满血时的形态，其余按血量比例从高到低排列
+    stages = [BossStage(1.0, _compile_fire(spec.get("fire"), rules))]
+    for stage in spec.get("stages", ()):
+        stages.append(BossStage(float(_value(stage, "health", rules)), _compile_fire(stage.get("fire"), rules)))
+    stages[1:] = sorted(stages[1:], key=lambda stage: -stage.health)
+
+    boss = int(spec["boss"])
+    if boss not in (1, 2):
+        raise ValueError(f"未知的Boss类型: {boss}")
+    return BossPhase(boss, int(_value(spec, "health", rules)), float(_value(spec, "speed", rules, 60)),
+                     float(_value(spec, "escape_time", rules, "boss_escape_time")),
+                     int(_value(spec, "escape_penalty", rules, 0)), float(_value(spec, "speed_up", rules, 1.0)),
+                     jumps[on_kill], jumps[on_escape], tuple(stages))
+
+
+# 展开repeat块，得到平铺的阶段列表
+def _flatten(entries, rules):
+    flat = []
+    for entry in entries:
+        if "repeat" in entry:
+            block = _flatten(entry["phases"], rules)
+            for _ in range(int(_value(entry, "repeat", rules))):
+                flat.extend(block)
+        else:
+            flat.append(entry)
+    return flat
+
+
+def compile_script(source, rules=None):
+    rules = rules if rules is not None else Rules()
+    entries = _flatten(source["phases"], rules)
+    if not entries:
+        raise ValueError("波次脚本没有任何阶段")
+
+    phases = []
+    for index, spec in enumerate(entries):
+        phase_type = spec.get("type")
+        if phase_type == "enemies":
+            phases.append(_compile_enemies(spec, rules))
+        elif phase_type == "boss":
+            phases.append(_compile_boss(spec, rules, index, len(entries)))
+        else:
+            raise ValueError(f"未知的阶段类型: {phase_type}")
+    boss1_required = sum(1 for phase in phases if isinstance(phase, BossPhase) and phase.boss == 1)
+    return WaveScript(tuple(phases), boss1_required)
+
+
+# 读取并编译波次脚本，同一文件和规则只编译一次
+def load_script(path=WAVE_SCRIPT, rules=None):
+    rules = rules if rules is not None else Rules()
+    key = (path, astuple(rules))
+    script = _compiled.get(key)
+    if script is None:
+        source = _sources.get(path)
+        if source is None:
+            with open(path, encoding="utf-8") as f:
+                source = _sources[path] = json.load(f)
+        script = _compiled[key] = compile_script(source, rules)
+    return script
+
+
+# 脚本中第一个指定类型Boss阶段的下标，没有时返回None
+def find_boss_phase(script, boss):
+    for index, phase in enumerate(script.phases):
+        if isinstance(phase, BossPhase) and phase.boss == boss:
+            return index
+    return None